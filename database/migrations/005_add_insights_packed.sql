@@ -0,0 +1,8 @@
+-- Compact copy of generated_digests.insights for the digest cache read path
+-- Stores zlib-compressed JSON, base64 encoded (see rag/digest_generator.py)
+
+ALTER TABLE generated_digests
+    ADD COLUMN IF NOT EXISTS insights_packed TEXT;
+
+-- The jsonb insights column is still written for the dashboard and
+-- insight search; drop it once those readers use insights_packed.
@@ -0,0 +1,5 @@
+-- Persist the quality badge computed at generation time so cached digests
+-- are self-contained (see DigestGenerator._store_digest)
+
+ALTER TABLE generated_digests
+    ADD COLUMN IF NOT EXISTS quality_badge TEXT;
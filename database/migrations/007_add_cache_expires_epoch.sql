@@ -0,0 +1,9 @@
+-- Integer (unix epoch seconds) copy of cache_expires_at so the digest cache
+-- check is a plain integer comparison (see DigestGenerator._get_cached_digest)
+
+ALTER TABLE generated_digests
+    ADD COLUMN IF NOT EXISTS cache_expires_epoch BIGINT;
+
+UPDATE generated_digests
+SET cache_expires_epoch = EXTRACT(EPOCH FROM cache_expires_at)::BIGINT
+WHERE cache_expires_at IS NOT NULL AND cache_expires_epoch IS NULL;
@@ -0,0 +1,24 @@
+-- Stored embeddings for generated insights, so past-insight search only
+-- embeds each insight once (see rag/insight_search.py)
+
+CREATE TABLE IF NOT EXISTS insight_embeddings (
+    insight_id TEXT PRIMARY KEY, -- id inside generated_digests.insights
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    digest_id UUID REFERENCES generated_digests(id) ON DELETE CASCADE,
+    embedding halfvec(1536) NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_insight_embeddings_user ON insight_embeddings(user_id);
+
+ALTER TABLE insight_embeddings ENABLE ROW LEVEL SECURITY;
+
+-- Users can manage their own insight embeddings
+CREATE POLICY "Users can manage own insight embeddings"
+    ON insight_embeddings FOR ALL
+    USING (auth.uid() = user_id);
+
+-- Allow anon access to test user's insight embeddings (development)
+CREATE POLICY "Allow anon access to test user insight embeddings"
+    ON insight_embeddings FOR ALL
+    USING (user_id = '00000000-0000-0000-0000-000000000001');
@@ -0,0 +1,45 @@
+-- Index-accelerated past-insight search (see rag/insight_search.py)
+
+CREATE INDEX IF NOT EXISTS idx_insight_embeddings_hnsw ON insight_embeddings
+USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE OR REPLACE FUNCTION match_insights(
+    query_embedding halfvec(1536),
+    filter_user_id uuid,
+    start_date date DEFAULT NULL,
+    end_date date DEFAULT NULL,
+    min_feedback_score int DEFAULT NULL,
+    match_count int DEFAULT 10
+)
+RETURNS TABLE (
+    insight_id text,
+    digest_id uuid,
+    digest_date date,
+    similarity float
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        ie.insight_id,
+        ie.digest_id,
+        d.digest_date,
+        1 - (ie.embedding <=> query_embedding) AS similarity
+    FROM insight_embeddings ie
+    JOIN generated_digests d ON ie.digest_id = d.id
+    WHERE
+        ie.user_id = filter_user_id
+        AND (start_date IS NULL OR d.digest_date >= start_date)
+        AND (end_date IS NULL OR d.digest_date <= end_date)
+        AND (
+            min_feedback_score IS NULL
+            OR (
+                SELECT COUNT(*)
+                FROM feedback f
+                WHERE f.insight_id::text = ie.insight_id
+                  AND f.type = 'helpful'
+            ) >= min_feedback_score
+        )
+    ORDER BY ie.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
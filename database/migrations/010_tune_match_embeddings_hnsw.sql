@@ -0,0 +1,60 @@
+-- Keep match_embeddings on the HNSW index (embeddings_vector_idx, see 001)
+--
+-- The kNN step now runs on embeddings alone, so the planner always uses the
+-- index; joins and filters apply to that candidate set afterwards. Candidates
+-- are over-fetched 4x so threshold/user/active filtering still leaves
+-- match_count rows, and ef_search is raised to cover that candidate count.
+
+CREATE OR REPLACE FUNCTION match_embeddings(
+    query_embedding halfvec(1536),
+    match_threshold float DEFAULT 0.70,
+    match_count int DEFAULT 15,
+    filter_user_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    content_id uuid,
+    chunk_text text,
+    chunk_sequence int,
+    similarity float,
+    content_title text,
+    content_url text,
+    content_author text,
+    published_at timestamptz,
+    source_id uuid,
+    source_priority int
+)
+LANGUAGE sql STABLE
+SET hnsw.ef_search = 200
+AS $$
+    WITH nearest AS (
+        SELECT
+            e.id,
+            e.embedding <=> query_embedding AS distance
+        FROM embeddings e
+        ORDER BY e.embedding <=> query_embedding
+        LIMIT match_count * 4
+    )
+    SELECT
+        e.id,
+        e.content_id,
+        e.chunk_text,
+        e.chunk_sequence,
+        1 - n.distance AS similarity,
+        c.title AS content_title,
+        c.url AS content_url,
+        c.author AS content_author,
+        c.published_at,
+        c.source_id,
+        s.priority AS source_priority
+    FROM nearest n
+    JOIN embeddings e ON e.id = n.id
+    JOIN content c ON e.content_id = c.id
+    JOIN sources s ON c.source_id = s.id
+    WHERE
+        1 - n.distance > match_threshold
+        AND s.active = true
+        AND (filter_user_id IS NULL OR s.user_id = filter_user_id)
+    ORDER BY n.distance
+    LIMIT match_count;
+$$;
@@ -0,0 +1,19 @@
+-- Per-type feedback counts for a user since a cutoff (see
+-- tools/feedback_handler.py get_feedback_stats); served by idx_feedback_user
+
+CREATE OR REPLACE FUNCTION feedback_breakdown(
+    p_user uuid,
+    p_since timestamptz
+)
+RETURNS TABLE (
+    type text,
+    n bigint
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT f.type, COUNT(*) AS n
+    FROM feedback f
+    WHERE f.user_id = p_user
+      AND f.created_at >= p_since
+    GROUP BY f.type;
+$$;
@@ -0,0 +1,16 @@
+-- Content count per source for a user in one grouped query (see
+-- tools/source_manager.py list_sources); the join uses idx_content_source
+
+CREATE OR REPLACE FUNCTION source_content_counts(p_user uuid)
+RETURNS TABLE (
+    source_id uuid,
+    n bigint
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT s.id AS source_id, COUNT(c.id) AS n
+    FROM sources s
+    LEFT JOIN content c ON c.source_id = s.id
+    WHERE s.user_id = p_user
+    GROUP BY s.id;
+$$;
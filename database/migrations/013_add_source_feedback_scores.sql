@@ -0,0 +1,23 @@
+-- Helpful ratio per source from a user's feedback, computed in one grouped
+-- query (see tools/feedback_handler.py get_source_feedback_scores).
+-- Sources whose feedback is all neutral types score 0.5.
+
+CREATE OR REPLACE FUNCTION source_feedback_scores(p_user uuid)
+RETURNS TABLE (
+    source_id uuid,
+    score float
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        c.source_id,
+        COALESCE(
+            COUNT(*) FILTER (WHERE f.type = 'helpful')::float
+                / NULLIF(COUNT(*) FILTER (WHERE f.type IN ('helpful', 'not_relevant', 'incorrect')), 0),
+            0.5
+        ) AS score
+    FROM feedback f
+    JOIN content c ON c.id = f.content_id
+    WHERE f.user_id = p_user
+    GROUP BY c.source_id;
+$$;
@@ -0,0 +1,71 @@
+-- Apply match_embeddings' user/active filters inside the HNSW scan
+--
+-- 010 took the global top match_count * 4 neighbours across every user's
+-- embeddings and filtered by user and active source afterwards, so a user
+-- whose content wasn't in that global set got few or no rows. The filters now
+-- sit in the kNN query itself, and iterative index scans (pgvector >= 0.8.0)
+-- keep walking the HNSW graph until match_count rows pass them. relaxed_order
+-- may return the candidates slightly out of order; the outer query re-sorts.
+-- The similarity threshold is applied to that sorted prefix, as before.
+
+CREATE OR REPLACE FUNCTION match_embeddings(
+    query_embedding halfvec(1536),
+    match_threshold float DEFAULT 0.70,
+    match_count int DEFAULT 15,
+    filter_user_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    content_id uuid,
+    chunk_text text,
+    chunk_sequence int,
+    similarity float,
+    content_title text,
+    content_url text,
+    content_author text,
+    published_at timestamptz,
+    source_id uuid,
+    source_priority int
+)
+LANGUAGE sql STABLE
+SET hnsw.ef_search = 100
+SET hnsw.iterative_scan = relaxed_order
+AS $$
+    WITH nearest AS MATERIALIZED (
+        SELECT
+            e.id,
+            e.content_id,
+            e.chunk_text,
+            e.chunk_sequence,
+            e.embedding <=> query_embedding AS distance,
+            c.title AS content_title,
+            c.url AS content_url,
+            c.author AS content_author,
+            c.published_at,
+            c.source_id,
+            s.priority AS source_priority
+        FROM embeddings e
+        JOIN content c ON e.content_id = c.id
+        JOIN sources s ON c.source_id = s.id
+        WHERE
+            s.active = true
+            AND (filter_user_id IS NULL OR s.user_id = filter_user_id)
+        ORDER BY e.embedding <=> query_embedding
+        LIMIT match_count
+    )
+    SELECT
+        n.id,
+        n.content_id,
+        n.chunk_text,
+        n.chunk_sequence,
+        1 - n.distance AS similarity,
+        n.content_title,
+        n.content_url,
+        n.content_author,
+        n.published_at,
+        n.source_id,
+        n.source_priority
+    FROM nearest n
+    WHERE 1 - n.distance > match_threshold
+    ORDER BY n.distance;
+$$;
@@ -5,12 +5,17 @@ Generates vector embeddings for text chunks using OpenAI API.
 """
 
 import logging
-from typing import List, Dict, Any
-from openai import AsyncOpenAI
+from typing import List, Dict, Any, Optional
 import asyncio
 
+from utils.embedding_cache import EmbeddingCache
+from utils.openai_client import get_openai_client
+
 logger = logging.getLogger(__name__)
 
+# Embedding requests allowed in flight at once per generate_embeddings call
+MAX_CONCURRENT_BATCHES = 5
+
 
 class Embedder:
     """Generates vector embeddings for text."""
@@ -21,6 +26,7 @@ class Embedder:
         model: str = "text-embedding-3-small",
         dimensions: int = 1536,
         batch_size: int = 100,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
         """
         Initialize embedder.
@@ -30,11 +36,14 @@ class Embedder:
             model: Embedding model name (default: text-embedding-3-small)
             dimensions: Embedding dimensions (default: 1536)
             batch_size: Number of texts to embed in one API call (default: 100)
+            embedding_cache: Chunk embedding cache (default: on-disk cache)
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = model
         self.dimensions = dimensions
         self.batch_size = batch_size
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        self._cache_model = f"{model}:{dimensions}"
 
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
@@ -55,18 +64,48 @@ class Embedder:
         logger.info(f"Generating embeddings for {len(texts)} texts")
 
         try:
-            # Process in batches to avoid API limits
-            all_embeddings = []
-
-            for i in range(0, len(texts), self.batch_size):
-                batch = texts[i : i + self.batch_size]
-                batch_embeddings = await self._embed_batch(batch)
-                all_embeddings.extend(batch_embeddings)
-
-                logger.debug(
-                    f"Processed batch {i // self.batch_size + 1}/{(len(texts) - 1) // self.batch_size + 1}"
+            # Feeds syndicate the same passages, so identical chunks are
+            # embedded once and reused across runs via the cache
+            cleaned_texts = [self._clean_text(text) for text in texts]
+            vectors: Dict[str, List[float]] = {}
+            to_embed = []
+            for text in dict.fromkeys(cleaned_texts):
+                cached = self.embedding_cache.get(self._cache_model, text)
+                if cached is not None:
+                    vectors[text] = cached.tolist()
+                else:
+                    to_embed.append(text)
+            if len(to_embed) < len(texts):
+                logger.debug(f"{len(texts) - len(to_embed)} embeddings served from cache")
+
+            # Process in batches to avoid API limits; batches run concurrently,
+            # at most MAX_CONCURRENT_BATCHES requests in flight
+            batches = [
+                to_embed[i : i + self.batch_size]
+                for i in range(0, len(to_embed), self.batch_size)
+            ]
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+            async def embed(batch_number: int, batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    batch_embeddings = await self._embed_batch(batch)
+                logger.debug(f"Processed batch {batch_number}/{len(batches)}")
+                return batch_embeddings
+
+            # gather preserves batch order
+            results = await asyncio.gather(
+                *(embed(number, batch) for number, batch in enumerate(batches, 1))
+            )
+            new_vectors = list(zip(to_embed, (e for batch in results for e in batch)))
+            vectors.update(new_vectors)
+            if new_vectors:
+                # One transaction (one fsync) for the run, off the event loop
+                await asyncio.to_thread(
+                    self.embedding_cache.set_many, self._cache_model, new_vectors
                 )
 
+            all_embeddings = [vectors[text] for text in cleaned_texts]
+
             logger.info(f"Successfully generated {len(all_embeddings)} embeddings")
             return all_embeddings
 
@@ -94,8 +133,8 @@ class Embedder:
             dimensions=self.dimensions,
         )
 
-        # Extract embeddings in order
-        embeddings = [item.embedding for item in response.data]
+        # Extract embeddings in input order
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
 
         return embeddings
 
@@ -8,17 +8,27 @@ Runs as a background worker with scheduled jobs.
 import logging
 import hashlib
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
+import orjson
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from supabase import Client
 
 from .rss_fetcher import RSSFetcher, fetch_multiple_feeds
 from .chunker import TextChunker, chunk_document
 from .embedder import Embedder
-from utils.db import get_supabase_client
+from utils.db import create_pg_pool, get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Rows per embeddings insert request (keeps PostgREST payloads bounded)
+INSERT_BATCH_SIZE = 500
+
+# Hashes per content_hash IN (...) lookup (keeps the query string bounded)
+HASH_LOOKUP_BATCH_SIZE = 200
+
+# Columns written per chunk; COPY records follow this order
+EMBEDDING_COLUMNS = ["content_id", "chunk_sequence", "chunk_text", "embedding", "metadata"]
+
 
 class IngestionOrchestrator:
     """Orchestrates the content ingestion pipeline."""
@@ -54,6 +64,9 @@ class IngestionOrchestrator:
             dimensions=embedding_dimensions,
         )
         self.scheduler = AsyncIOScheduler()
+        # Direct Postgres pool for COPY, opened on first write if configured
+        self._pg_pool: Optional[Any] = None
+        self._pg_pool_checked = False
 
     async def ingest_source(
         self,
@@ -149,20 +162,15 @@ class IngestionOrchestrator:
         chunks_created = 0
         duplicates_skipped = 0
 
-        for article in articles:
-            try:
-                # Generate content hash for deduplication
-                content_hash = hashlib.md5(article["content"].encode()).hexdigest()
-
-                # Check if article already exists
-                existing = (
-                    self.db.table("content")
-                    .select("id")
-                    .eq("content_hash", content_hash)
-                    .execute()
-                )
+        # Content hashes for deduplication, checked in one round-trip per
+        # batch rather than one SELECT per article
+        hashes = [hashlib.md5(article["content"].encode()).hexdigest() for article in articles]
+        seen_hashes = self._fetch_existing_hashes(hashes)
 
-                if existing.data:
+        for article, content_hash in zip(articles, hashes):
+            try:
+                # Skip articles already stored (or repeated earlier in this feed)
+                if content_hash in seen_hashes:
                     duplicates_skipped += 1
                     logger.debug(f"Skipping duplicate article: {article['title']}")
                     continue
@@ -191,6 +199,7 @@ class IngestionOrchestrator:
                 )
 
                 content_id = content_result.data[0]["id"]
+                seen_hashes.add(content_hash)
 
                 # Chunk the article
                 chunks = chunk_document(article)
@@ -203,17 +212,18 @@ class IngestionOrchestrator:
                 chunk_texts = [chunk["chunk_text"] for chunk in chunks]
                 embeddings = await self.embedder.generate_embeddings(chunk_texts)
 
-                # Store chunks with embeddings
-                for chunk, embedding in zip(chunks, embeddings):
-                    self.db.table("embeddings").insert(
-                        {
-                            "content_id": content_id,
-                            "chunk_sequence": chunk["chunk_sequence"],
-                            "chunk_text": chunk["chunk_text"],
-                            "embedding": embedding,
-                            "metadata": chunk.get("metadata", {}),
-                        }
-                    ).execute()
+                # Store chunks with embeddings, one multi-row insert per batch
+                rows = [
+                    {
+                        "content_id": content_id,
+                        "chunk_sequence": chunk["chunk_sequence"],
+                        "chunk_text": chunk["chunk_text"],
+                        "embedding": embedding,
+                        "metadata": chunk.get("metadata", {}),
+                    }
+                    for chunk, embedding in zip(chunks, embeddings)
+                ]
+                await self._insert_embeddings(rows)
 
                 articles_processed += 1
                 chunks_created += len(chunks)
@@ -233,6 +243,83 @@ class IngestionOrchestrator:
             "duplicates_skipped": duplicates_skipped,
         }
 
+    async def _insert_embeddings(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Store chunk rows in the embeddings table.
+
+        Uses binary COPY over a direct Postgres connection when one is
+        configured (no JSON encoding or PostgREST round-trips), otherwise
+        multi-row PostgREST inserts of INSERT_BATCH_SIZE rows.
+
+        Args:
+            rows: Embeddings rows keyed by EMBEDDING_COLUMNS
+        """
+        pool = await self._get_pg_pool()
+        if pool is not None:
+            records = [
+                (
+                    row["content_id"],
+                    row["chunk_sequence"],
+                    row["chunk_text"],
+                    row["embedding"],
+                    orjson.dumps(row["metadata"]).decode(),
+                )
+                for row in rows
+            ]
+            try:
+                async with pool.acquire() as conn:
+                    await conn.copy_records_to_table(
+                        "embeddings", records=records, columns=EMBEDDING_COLUMNS
+                    )
+                return
+            except Exception as e:
+                # COPY is all-or-nothing, so retrying every row is safe
+                logger.warning(f"COPY into embeddings failed, using PostgREST: {e}")
+
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            self.db.table("embeddings").insert(rows[start : start + INSERT_BATCH_SIZE]).execute()
+
+    async def _get_pg_pool(self) -> Optional[Any]:
+        """Return the direct Postgres pool, or None to write through PostgREST."""
+        if not self._pg_pool_checked:
+            self._pg_pool_checked = True
+            self._pg_pool = await create_pg_pool()
+        return self._pg_pool
+
+    async def close(self) -> None:
+        """Close the feed HTTP client and the direct Postgres pool, if opened."""
+        await self.rss_fetcher.aclose()
+        if self._pg_pool is not None:
+            await self._pg_pool.close()
+            self._pg_pool = None
+        self._pg_pool_checked = False
+
+    def _fetch_existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Find which content hashes are already stored.
+
+        Args:
+            hashes: Content hashes to look up
+
+        Returns:
+            Subset of hashes present in the content table
+        """
+        unique_hashes = list(dict.fromkeys(hashes))
+        existing: Set[str] = set()
+        try:
+            for start in range(0, len(unique_hashes), HASH_LOOKUP_BATCH_SIZE):
+                result = (
+                    self.db.table("content")
+                    .select("content_hash")
+                    .in_("content_hash", unique_hashes[start : start + HASH_LOOKUP_BATCH_SIZE])
+                    .execute()
+                )
+                existing.update(row["content_hash"] for row in result.data)
+        except Exception as e:
+            # content_hash is UNIQUE, so duplicates still fail at insert time
+            logger.warning(f"Error checking existing content hashes: {e}")
+        return existing
+
     async def _update_source_health(self, source_id: str, success: bool) -> None:
         """
         Update source health score and last_fetched timestamp.
@@ -352,7 +439,10 @@ async def run_manual_ingestion(
         openai_api_key=openai_api_key,
     )
 
-    stats = await orchestrator.ingest_all_active_sources(user_id=user_id)
+    try:
+        stats = await orchestrator.ingest_all_active_sources(user_id=user_id)
+    finally:
+        await orchestrator.close()
 
     logger.info(f"Manual ingestion complete: {stats}")
     print(f"\nIngestion Statistics:")
@@ -11,8 +11,20 @@ from typing import List, Dict, Any, Optional
 import httpx
 from bs4 import BeautifulSoup
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # optional: C HTML parser, much faster than BeautifulSoup
+    HTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+# Elements dropped (with their text) before extracting article text
+_NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header"]
+
+# Feed fetch limits; one pooled client serves every feed a fetcher reads
+FETCH_TIMEOUT_SECONDS = 30.0
+FETCH_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
 
 class RSSFetcher:
     """Fetcher for RSS feeds."""
@@ -25,6 +37,27 @@ class RSSFetcher:
             user_agent: User agent string for HTTP requests
         """
         self.user_agent = user_agent
+        # Feed URL -> conditional request headers (ETag / Last-Modified) from
+        # its last full response
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, keeping connections alive across feeds."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers={"User-Agent": self.user_agent},
+                timeout=FETCH_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                limits=FETCH_LIMITS,
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client, if one was opened."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def fetch_feed(
         self,
@@ -49,16 +82,19 @@ class RSSFetcher:
         logger.info(f"Fetching RSS feed: {feed_url}")
 
         try:
-            # Fetch feed with custom user agent
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    feed_url,
-                    headers={"User-Agent": self.user_agent},
-                    timeout=30.0,
-                    follow_redirects=True,
-                )
-                response.raise_for_status()
-                feed_content = response.text
+            # Fetch feed with custom user agent. Incremental fetches send the
+            # validators from the last response, so an unchanged feed answers
+            # 304 with no body instead of being downloaded and parsed again.
+            headers = self._validators.get(feed_url, {}) if since is not None else {}
+
+            response = await self._get_http_client().get(feed_url, headers=headers)
+            if response.status_code == 304:
+                logger.info(f"Feed not modified since last fetch: {feed_url}")
+                return []
+            response.raise_for_status()
+            feed_content = response.text
+
+            self._remember_validators(feed_url, response.headers)
 
             # Parse feed
             feed = feedparser.parse(feed_content)
@@ -88,6 +124,25 @@ class RSSFetcher:
             logger.error(f"Error fetching feed {feed_url}: {e}", exc_info=True)
             raise
 
+    def _remember_validators(self, feed_url: str, response_headers: httpx.Headers) -> None:
+        """
+        Keep a feed's cache validators for the next conditional request.
+
+        Args:
+            feed_url: URL of the RSS feed
+            response_headers: Headers of a full (200) feed response
+        """
+        validators = {}
+        if etag := response_headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := response_headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+
+        if validators:
+            self._validators[feed_url] = validators
+        else:
+            self._validators.pop(feed_url, None)
+
     def _parse_entry(self, entry: Any) -> Dict[str, Any]:
         """
         Parse a feed entry into article dictionary.
@@ -153,14 +208,23 @@ class RSSFetcher:
             return ""
 
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
+            if HTMLParser is not None:
+                tree = HTMLParser(html_content)
+
+                # Remove script and style elements
+                tree.strip_tags(_NON_CONTENT_TAGS)
+
+                # Get text
+                text = tree.text(separator=" ", strip=True)
+            else:
+                soup = BeautifulSoup(html_content, "html.parser")
 
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
+                # Remove script and style elements
+                for script in soup(_NON_CONTENT_TAGS):
+                    script.decompose()
 
-            # Get text
-            text = soup.get_text(separator=" ", strip=True)
+                # Get text
+                text = soup.get_text(separator=" ", strip=True)
 
             # Clean up whitespace
             lines = (line.strip() for line in text.splitlines())
@@ -222,7 +286,10 @@ async def fetch_multiple_feeds(
 
     # Fetch all feeds concurrently
     tasks = [fetch_one(url) for url in feed_urls]
-    fetch_results = await asyncio.gather(*tasks)
+    try:
+        fetch_results = await asyncio.gather(*tasks)
+    finally:
+        await fetcher.aclose()
 
     for url, articles in fetch_results:
         results[url] = articles
@@ -5,9 +5,19 @@ Orchestrates the full RAG pipeline to generate personalized daily digests.
 Combines query building, retrieval, and synthesis.
 """
 
+import asyncio
+import base64
+import bisect
+import hashlib
 import logging
+import math
+import os
+import time
+import zlib
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
+from anthropic import AsyncAnthropic
 from supabase import Client
 
 from .query_builder import QueryBuilder
@@ -15,9 +25,34 @@ from .retriever import VectorRetriever
 from .synthesizer import EducationalSynthesizer
 from .evaluator import RAGASEvaluator, QualityGate
 from ..utils.db import get_supabase_client
+from ..utils.disk_cache import DiskCache, default_cache_path
 
 logger = logging.getLogger(__name__)
 
+# Quality badges by minimum average RAGAS score (ascending)
+_BADGES = (
+    (0.0, "⚠️"),  # Below threshold
+    (0.70, "✓"),  # Good quality
+    (0.85, "✨"),  # High quality
+)
+_BADGE_THRESHOLDS = tuple(threshold for threshold, _ in _BADGES)
+
+# Digests kept in memory in front of the generated_digests cache (oldest evicted first)
+DIGEST_MEMORY_CACHE_SIZE = 128
+
+# How long synthesized + evaluated insights are reused for identical inputs
+SYNTHESIS_CACHE_TTL_SECONDS = 3 * 24 * 3600
+
+
+def _pack_insights(insights: List[Dict[str, Any]]) -> str:
+    """Compress insights for the `insights_packed` column (zlib + base64)."""
+    return base64.b64encode(zlib.compress(orjson.dumps(insights), 6)).decode("ascii")
+
+
+def _unpack_insights(packed: str) -> List[Dict[str, Any]]:
+    """Inverse of `_pack_insights`."""
+    return orjson.loads(zlib.decompress(base64.b64decode(packed)))
+
 
 class DigestGenerator:
     """Generates personalized daily learning digests."""
@@ -32,6 +67,8 @@ class DigestGenerator:
         claude_model: str = "claude-sonnet-4-5-20250929",
         ragas_min_score: float = 0.70,
         ragas_max_retries: int = 2,
+        anthropic_client: Optional[AsyncAnthropic] = None,
+        synthesis_cache: Optional[DiskCache] = None,
     ):
         """
         Initialize digest generator.
@@ -45,8 +82,13 @@ class DigestGenerator:
             claude_model: Claude model for synthesis
             ragas_min_score: Minimum RAGAS score for quality gate
             ragas_max_retries: Maximum retry attempts for quality gate
+            anthropic_client: Shared Anthropic client for the synthesizer (optional)
+            synthesis_cache: Cache of gated insights per synthesis input
+                (default: on-disk cache)
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
+        # (user_id, date) -> (cache_expires_epoch, digest); mirrors generated_digests
+        self._digest_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
 
         self.query_builder = QueryBuilder(
             supabase_url=supabase_url,
@@ -65,6 +107,7 @@ class DigestGenerator:
             self.synthesizer = EducationalSynthesizer(
                 api_key=anthropic_api_key,
                 model=claude_model,
+                client=anthropic_client,
             )
             self.use_anthropic = True
         else:
@@ -84,6 +127,12 @@ class DigestGenerator:
             max_retries=ragas_max_retries,
         )
 
+        self.synthesis_cache = synthesis_cache or DiskCache(
+            os.getenv("SYNTHESIS_CACHE_PATH")
+            or default_cache_path("learning_coach_synthesis.sqlite3"),
+            ttl_seconds=SYNTHESIS_CACHE_TTL_SECONDS,
+        )
+
     async def generate(
         self,
         user_id: str,
@@ -91,6 +140,7 @@ class DigestGenerator:
         max_insights: int = 7,
         force_refresh: bool = False,
         explicit_query: Optional[str] = None,
+        batch: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate daily digest for a user.
@@ -101,6 +151,7 @@ class DigestGenerator:
             max_insights: Maximum number of insights to generate (default: 7)
             force_refresh: Skip cache and regenerate (default: False)
             explicit_query: Optional explicit query from user
+            batch: Synthesize via the Message Batches API (scheduled runs)
 
         Returns:
             Digest dictionary with insights and metadata
@@ -115,10 +166,28 @@ class DigestGenerator:
                 return cached_digest
 
         # 2. Build query from learning context
-        query_result = await self.query_builder.build_query_from_context(
-            user_id=user_id,
-            explicit_query=explicit_query,
-        )
+        chunks = None
+        if explicit_query:
+            # Retrieval for an explicit query doesn't depend on the learning
+            # context, so overlap it with the context fetch. Retrieval goes
+            # first so its embedding request is in flight during the DB call.
+            chunks, query_result = await asyncio.gather(
+                self.retriever.retrieve(
+                    query=explicit_query,
+                    user_id=user_id,
+                    top_k=15,
+                    similarity_threshold=0.70,
+                ),
+                self.query_builder.build_query_from_context(
+                    user_id=user_id,
+                    explicit_query=explicit_query,
+                ),
+            )
+        else:
+            query_result = await self.query_builder.build_query_from_context(
+                user_id=user_id,
+                explicit_query=explicit_query,
+            )
 
         query_text = query_result["query_text"]
         learning_context = query_result["learning_context"]
@@ -133,12 +202,13 @@ class DigestGenerator:
             }
 
         # 3. Retrieve relevant chunks
-        chunks = await self.retriever.retrieve(
-            query=query_text,
-            user_id=user_id,
-            top_k=15,
-            similarity_threshold=0.70,
-        )
+        if chunks is None:
+            chunks = await self.retriever.retrieve(
+                query=query_text,
+                user_id=user_id,
+                top_k=15,
+                similarity_threshold=0.70,
+            )
 
         if not chunks:
             logger.warning("No chunks retrieved, returning empty digest")
@@ -152,27 +222,58 @@ class DigestGenerator:
                 "Anthropic API key not configured. Please add ANTHROPIC_API_KEY to your Claude Desktop config."
             )
         
-        synthesis_result = await self.synthesizer.synthesize_insights(
-            retrieved_chunks=chunks,
-            learning_context=learning_context,
-            query=query_text,
-            num_insights=min(max_insights, 10),  # Cap at 10
+        num_insights = min(max_insights, 10)  # Cap at 10
+
+        # The corpus often hasn't changed since the last run: the same chunks
+        # for the same query and context reuse the previous gated insights
+        synthesis_key = self._synthesis_cache_key(
+            query_text, learning_context, num_insights, chunks
         )
+        cached_synthesis = None if force_refresh else self.synthesis_cache.get(synthesis_key)
+
+        if cached_synthesis is not None:
+            logger.info("Reusing insights synthesized from the same retrieved chunks")
+            num_synthesized, final_insights, ragas_scores, passed_gate = orjson.loads(
+                cached_synthesis
+            )
+            # Insight IDs key feedback and insight_embeddings, so a digest
+            # built from reused insights must not share them with the old one
+            self._reissue_insight_ids(final_insights)
+        else:
+            synthesis_result = await self.synthesizer.synthesize_insights(
+                retrieved_chunks=chunks,
+                learning_context=learning_context,
+                query=query_text,
+                num_insights=num_insights,
+                batch=batch,
+            )
 
-        insights = synthesis_result["insights"]
+            insights = synthesis_result["insights"]
 
-        if not insights:
-            logger.warning("No insights generated, returning empty digest")
-            return self._create_empty_digest(date, "Failed to generate insights")
+            if not insights:
+                logger.warning("No insights generated, returning empty digest")
+                return self._create_empty_digest(date, "Failed to generate insights")
 
-        # 5. Apply RAGAS evaluation and quality gate
-        final_insights, ragas_scores, passed_gate = await self.quality_gate.apply_gate(
-            query=query_text,
-            insights=insights,
-            retrieved_chunks=chunks,
-            synthesizer=self.synthesizer,
-            learning_context=learning_context,
-        )
+            # 5. Apply RAGAS evaluation and quality gate
+            final_insights, ragas_scores, passed_gate = await self.quality_gate.apply_gate(
+                query=query_text,
+                insights=insights,
+                retrieved_chunks=chunks,
+                synthesizer=self.synthesizer,
+                learning_context=learning_context,
+            )
+
+            num_synthesized = len(insights)
+            # Only reuse insights that passed the gate with real scores; a
+            # failed or unscorable synthesis is retried on the next run
+            if passed_gate and all(math.isfinite(score) for score in ragas_scores.values()):
+                self.synthesis_cache.set(
+                    synthesis_key,
+                    orjson.dumps(
+                        [num_synthesized, final_insights, ragas_scores, passed_gate],
+                        default=str,
+                    ),
+                )
 
         # Update quality badge based on scores
         quality_badge = self._determine_quality_badge(ragas_scores)
@@ -189,7 +290,7 @@ class DigestGenerator:
                 "query": query_text,
                 "learning_context": learning_context,
                 "num_chunks_used": len(chunks),
-                "num_insights": len(insights),
+                "num_insights": num_synthesized,
                 "sources": list(set(c["source_id"] for c in chunks)),
                 "avg_similarity": sum(c["similarity"] for c in chunks) / len(chunks),
             },
@@ -198,9 +299,58 @@ class DigestGenerator:
         # 6. Store digest in database (with cache)
         await self._store_digest(user_id, digest)
 
-        logger.info(f"Digest generated successfully: {len(insights)} insights")
+        logger.info(f"Digest generated successfully: {num_synthesized} insights")
         return digest
 
+    @staticmethod
+    def _reissue_insight_ids(insights: List[Dict[str, Any]]) -> None:
+        """
+        Give reused insights new IDs and generation times, in place.
+
+        Args:
+            insights: Insights loaded from `synthesis_cache`
+        """
+        now = datetime.now()
+        timestamp = now.timestamp()
+        generated_at = now.isoformat()
+        for i, insight in enumerate(insights):
+            # Same format as EducationalSynthesizer._validate_and_enrich_insights
+            insight["id"] = f"insight_{timestamp}_{i}"
+            insight["generated_at"] = generated_at
+
+    def _synthesis_cache_key(
+        self,
+        query_text: str,
+        learning_context: Dict[str, Any],
+        num_insights: int,
+        chunks: List[Dict[str, Any]],
+    ) -> bytes:
+        """
+        Fingerprint everything synthesis and the quality gate depend on.
+
+        Args:
+            query_text: Retrieval query
+            learning_context: User's learning context
+            num_insights: Requested number of insights
+            chunks: Retrieved chunks (identified by embedding ID, in rank order)
+
+        Returns:
+            Cache key for `synthesis_cache`
+        """
+        return hashlib.sha256(
+            orjson.dumps(
+                [
+                    self.synthesizer.model,
+                    query_text,
+                    learning_context,
+                    num_insights,
+                    [chunk["id"] for chunk in chunks],
+                ],
+                default=str,
+                option=orjson.OPT_SORT_KEYS,
+            )
+        ).digest()
+
     async def _get_cached_digest(
         self,
         user_id: str,
@@ -216,39 +366,55 @@ class DigestGenerator:
         Returns:
             Cached digest or None
         """
+        key = (user_id, date.isoformat())
+        cached = self._digest_cache.get(key)
+        if cached:
+            if cached[0] >= time.time():
+                return cached[1]
+            del self._digest_cache[key]
+
         try:
+            # Read the compact column only; the jsonb `insights` column is kept
+            # for the dashboard and insight search but is not needed here
             result = (
                 self.db.table("generated_digests")
-                .select("*")
+                .select(
+                    "digest_date, insights_packed, ragas_scores, quality_badge, "
+                    "generated_at, cache_expires_epoch, metadata"
+                )
                 .eq("user_id", user_id)
                 .eq("digest_date", date.isoformat())
                 .single()
                 .execute()
             )
 
-            if not result.data:
+            # Rows written before `insights_packed` existed count as a miss
+            # and are rewritten on regeneration
+            if not result.data or not result.data.get("insights_packed"):
                 return None
 
             # Check if cache expired (6 hours by default)
-            cache_expires = result.data.get("cache_expires_at")
-            if cache_expires:
-                expires_dt = datetime.fromisoformat(cache_expires)
-                if datetime.now() > expires_dt:
-                    logger.debug("Cached digest expired")
-                    return None
+            if (result.data.get("cache_expires_epoch") or 0) < time.time():
+                logger.debug("Cached digest expired")
+                return None
 
             # Reconstruct digest from database
-            return {
+            ragas_scores = result.data.get("ragas_scores") or {}
+            digest = {
                 "date": result.data["digest_date"],
-                "insights": result.data["insights"],
-                "ragas_scores": result.data.get("ragas_scores", {}),
-                "quality_badge": self._determine_quality_badge(
-                    result.data.get("ragas_scores", {})
+                "insights": _unpack_insights(result.data["insights_packed"]),
+                "ragas_scores": ragas_scores,
+                # Badge is persisted at write time; older rows fall back to recomputing
+                "quality_badge": (
+                    result.data.get("quality_badge")
+                    or self._determine_quality_badge(ragas_scores)
                 ),
                 "generated_at": result.data["generated_at"],
                 "metadata": result.data.get("metadata", {}),
                 "cached": True,
             }
+            self._remember_digest(key, result.data["cache_expires_epoch"], digest)
+            return digest
 
         except Exception as e:
             logger.debug(f"No cached digest found: {e}")
@@ -272,19 +438,46 @@ class DigestGenerator:
                     "user_id": user_id,
                     "digest_date": digest["date"],
                     "insights": digest["insights"],
+                    "insights_packed": _pack_insights(digest["insights"]),
                     "ragas_scores": digest.get("ragas_scores", {}),
+                    "quality_badge": digest.get("quality_badge"),
                     "generated_at": digest["generated_at"],
                     "cache_expires_at": cache_expires_at.isoformat(),
+                    "cache_expires_epoch": int(cache_expires_at.timestamp()),
                     "metadata": digest.get("metadata", {}),
                 }
             ).execute()
 
+            self._remember_digest(
+                (user_id, digest["date"]),
+                cache_expires_at.timestamp(),
+                {**digest, "cached": True},
+            )
             logger.debug("Digest stored in database")
 
         except Exception as e:
             logger.error(f"Error storing digest: {e}")
             # Non-critical error, continue
 
+    def _remember_digest(
+        self,
+        key: Tuple[str, str],
+        expires_epoch: float,
+        digest: Dict[str, Any],
+    ) -> None:
+        """
+        Keep a digest in the in-memory cache until its database cache expiry.
+
+        Args:
+            key: (user_id, ISO date)
+            expires_epoch: Expiry as a Unix timestamp
+            digest: Digest to serve on later cache hits
+        """
+        self._digest_cache.pop(key, None)
+        if len(self._digest_cache) >= DIGEST_MEMORY_CACHE_SIZE:
+            del self._digest_cache[next(iter(self._digest_cache))]
+        self._digest_cache[key] = (expires_epoch, digest)
+
     def _create_empty_digest(self, date: datetime.date, reason: str) -> Dict[str, Any]:
         """
         Create an empty digest with error message.
@@ -319,13 +512,12 @@ class DigestGenerator:
             Quality badge emoji
         """
         avg_score = ragas_scores.get("average", 0)
-
-        if avg_score >= 0.85:
-            return "✨"  # High quality
-        elif avg_score >= 0.70:
-            return "✓"  # Good quality
-        else:
-            return "⚠️"  # Below threshold
+        # A failed evaluation (NaN, or null once stored as JSON) would sort
+        # past every threshold; it gets the warning badge, as it always has
+        if avg_score is None or not math.isfinite(avg_score):
+            return _BADGES[0][1]
+        index = bisect.bisect_right(_BADGE_THRESHOLDS, avg_score) - 1
+        return _BADGES[max(index, 0)][1]
 
 
 async def test_digest_generation(
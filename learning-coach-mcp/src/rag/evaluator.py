@@ -7,24 +7,43 @@ Evaluates generated insights using RAGAS metrics:
 - Context Recall: Coverage of key information
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import math
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, List, Optional, Tuple
 import asyncio
 
+import orjson
+
+from ..utils.disk_cache import DiskCache, default_cache_path
+
 logger = logging.getLogger(__name__)
 
+# Entries kept in each per-evaluator formatting memo
+_MEMO_SIZE = 64
+
+# Conservative score used when a single metric's evaluation fails
+METRIC_FALLBACK_SCORE = 0.75
+
 
 class RAGASEvaluator:
     """Evaluates RAG quality using RAGAS metrics."""
 
-    def __init__(self, min_score: float = 0.70):
+    def __init__(self, min_score: float = 0.70, score_cache: Optional[DiskCache] = None):
         """
         Initialize RAGAS evaluator.
 
         Args:
             min_score: Minimum acceptable score (default: 0.70)
+            score_cache: Score cache shared by worker processes
+                (default: $RAGAS_CACHE_PATH or the user cache dir)
         """
         self.min_score = min_score
+        self._score_cache = score_cache
+        self._contexts_memo: OrderedDict = OrderedDict()
+        self._response_memo: OrderedDict = OrderedDict()
 
         # Lazy import RAGAS (only when needed)
         try:
@@ -41,6 +60,12 @@ class RAGASEvaluator:
             self.context_recall = NonLLMContextRecall()
             self.ragas_available = True
 
+            if self._score_cache is None:
+                self._score_cache = DiskCache(
+                    os.getenv("RAGAS_CACHE_PATH")
+                    or default_cache_path("learning_coach_ragas.sqlite3")
+                )
+
             logger.info("RAGAS metrics initialized successfully")
 
         except ImportError as e:
@@ -72,8 +97,26 @@ class RAGASEvaluator:
 
         try:
             # Prepare data for evaluation
-            response = self._format_insights_for_eval(insights)
-            contexts = [chunk["chunk_text"] for chunk in retrieved_chunks]
+            response = self._memoized(
+                self._response_memo,
+                self._ids_key(insights),
+                lambda: self._format_insights_for_eval(insights),
+            )
+            contexts = self._memoized(
+                self._contexts_memo,
+                self._ids_key(retrieved_chunks),
+                lambda: [chunk["chunk_text"] for chunk in retrieved_chunks],
+            )
+
+            # Judge calls are expensive; identical inputs from any worker
+            # process reuse the stored scores
+            cache_key = hashlib.sha256(
+                orjson.dumps([query, response, contexts])
+            ).digest()
+            cached = self._score_cache.get(cache_key)
+            if cached is not None:
+                logger.info("RAGAS scores served from cache")
+                return orjson.loads(cached)
 
             # Create RAGAS sample
             sample = self.SingleTurnSample(
@@ -83,7 +126,7 @@ class RAGASEvaluator:
             )
 
             # Evaluate each metric (run concurrently)
-            scores = await self._evaluate_all_metrics(sample, contexts)
+            scores, all_computed = await self._evaluate_all_metrics(sample, contexts)
 
             # Calculate average
             scores["average"] = (
@@ -98,6 +141,11 @@ class RAGASEvaluator:
                 f"avg={scores['average']:.3f}"
             )
 
+            # Only share fully judged scores: a fallback from a failed metric
+            # (e.g. a rate limit) or a NaN from a RAGAS parse failure would
+            # otherwise be served for the cache's whole TTL
+            if all_computed and all(math.isfinite(score) for score in scores.values()):
+                self._score_cache.set(cache_key, orjson.dumps(scores))
             return scores
 
         except Exception as e:
@@ -108,7 +156,7 @@ class RAGASEvaluator:
         self,
         sample: Any,
         contexts: List[str],
-    ) -> Dict[str, float]:
+    ) -> Tuple[Dict[str, float], bool]:
         """
         Evaluate all RAGAS metrics concurrently.
 
@@ -117,7 +165,8 @@ class RAGASEvaluator:
             contexts: Retrieved context strings
 
         Returns:
-            Dictionary with individual scores
+            Tuple of (individual scores, whether every metric was actually
+            computed rather than filled in with a fallback)
         """
         # Run metrics in parallel
         tasks = [
@@ -128,44 +177,50 @@ class RAGASEvaluator:
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Extract scores (with fallbacks for errors)
-        faithfulness_score = results[0] if not isinstance(results[0], Exception) else 0.0
-        precision_score = results[1] if not isinstance(results[1], Exception) else 0.0
-        recall_score = results[2] if not isinstance(results[2], Exception) else 0.0
-
-        return {
-            "faithfulness": float(faithfulness_score),
-            "context_precision": float(precision_score),
-            "context_recall": float(recall_score),
-        }
-
-    async def _evaluate_faithfulness(self, sample: Any) -> float:
-        """Evaluate faithfulness (factual consistency)."""
+        # Extract scores: metric helpers return None after their own
+        # failures (conservative 0.75), anything raised past them scores 0.0
+        scores = {}
+        all_computed = True
+        for metric, result in zip(("faithfulness", "context_precision", "context_recall"), results):
+            if isinstance(result, Exception):
+                scores[metric] = 0.0
+                all_computed = False
+            elif result is None:
+                scores[metric] = METRIC_FALLBACK_SCORE
+                all_computed = False
+            else:
+                scores[metric] = float(result)
+
+        return scores, all_computed
+
+    async def _evaluate_faithfulness(self, sample: Any) -> Optional[float]:
+        """Evaluate faithfulness (factual consistency); None if the judge call failed."""
         try:
             score = await self.faithfulness.single_turn_ascore(sample)
             return float(score)
         except Exception as e:
             logger.warning(f"Faithfulness evaluation failed: {e}")
-            return 0.75  # Conservative fallback
+            return None
 
-    async def _evaluate_context_precision(self, sample: Any) -> float:
-        """Evaluate context precision (relevance of chunks)."""
+    async def _evaluate_context_precision(self, sample: Any) -> Optional[float]:
+        """Evaluate context precision (relevance of chunks); None if the judge call failed."""
         try:
             score = await self.context_precision.single_turn_ascore(sample)
             return float(score)
         except Exception as e:
             logger.warning(f"Context precision evaluation failed: {e}")
-            return 0.75  # Conservative fallback
+            return None
 
-    async def _evaluate_context_recall(self, sample: Any, contexts: List[str]) -> float:
-        """Evaluate context recall (coverage of information)."""
+    async def _evaluate_context_recall(self, sample: Any, contexts: List[str]) -> Optional[float]:
+        """Evaluate context recall (coverage of information); None if scoring failed."""
         try:
-            # NonLLMContextRecall doesn't need reference contexts
+            # NonLLMContextRecall scores with string distance only; it makes
+            # no embedding or LLM calls, so there is nothing to batch here
             score = await self.context_recall.single_turn_ascore(sample)
             return float(score)
         except Exception as e:
             logger.warning(f"Context recall evaluation failed: {e}")
-            return 0.75  # Conservative fallback
+            return None
 
     def _format_insights_for_eval(self, insights: List[Dict[str, Any]]) -> str:
         """
@@ -185,6 +240,25 @@ class RAGASEvaluator:
 
         return "\n\n---\n\n".join(texts)
 
+    @staticmethod
+    def _ids_key(items: List[Dict[str, Any]]) -> Optional[tuple]:
+        """Build a memo key from item ids, or None if any item lacks one."""
+        ids = tuple(item.get("id") for item in items)
+        return None if None in ids else ids
+
+    @staticmethod
+    def _memoized(memo: OrderedDict, key: Optional[Hashable], build):
+        """Return memo[key], building and storing it (LRU) on a miss."""
+        if key is None:
+            return build()
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+        value = memo[key] = build()
+        if len(memo) > _MEMO_SIZE:
+            memo.popitem(last=False)
+        return value
+
     def _placeholder_scores(self) -> Dict[str, float]:
         """Return placeholder scores when RAGAS unavailable."""
         return {
@@ -250,27 +324,37 @@ class QualityGate:
             retrieved_chunks: Retrieved chunks
             synthesizer: Synthesizer instance for retries
             learning_context: Learning context
-            retry_count: Current retry attempt
+            retry_count: Attempt to start from (default: 0)
 
         Returns:
             Tuple of (final_insights, final_scores, passed)
         """
-        # Evaluate current insights
-        scores = await self.evaluator.evaluate_digest(
-            query=query,
-            insights=insights,
-            retrieved_chunks=retrieved_chunks,
-        )
+        # Without RAGAS the scores are fixed placeholders, so evaluating (or
+        # retrying synthesis) cannot change the outcome
+        if not self.evaluator.ragas_available:
+            scores = self.evaluator._placeholder_scores()
+            return (insights, scores, self.evaluator.passes_quality_gate(scores))
+
+        last_attempt = max(retry_count, self.max_retries)
+
+        for attempt in range(retry_count, last_attempt + 1):
+            # Evaluate current insights
+            scores = await self.evaluator.evaluate_digest(
+                query=query,
+                insights=insights,
+                retrieved_chunks=retrieved_chunks,
+            )
 
-        # Check if passes
-        if self.evaluator.passes_quality_gate(scores):
-            logger.info("✓ Quality gate passed")
-            return (insights, scores, True)
+            # Check if passes
+            if self.evaluator.passes_quality_gate(scores):
+                logger.info("✓ Quality gate passed")
+                return (insights, scores, True)
+
+            if attempt == last_attempt:
+                break
 
-        # If failed and retries available
-        if retry_count < self.max_retries:
             logger.warning(
-                f"Quality gate failed (attempt {retry_count + 1}/{self.max_retries + 1}), "
+                f"Quality gate failed (attempt {attempt + 1}/{self.max_retries + 1}), "
                 f"retrying with stricter synthesis..."
             )
 
@@ -283,21 +367,11 @@ class QualityGate:
                 stricter=True,  # Enable strict mode
             )
 
-            retry_insights = retry_result["insights"]
-
-            # Recursively apply gate to retry
-            return await self.apply_gate(
-                query=query,
-                insights=retry_insights,
-                retrieved_chunks=retrieved_chunks,
-                synthesizer=synthesizer,
-                learning_context=learning_context,
-                retry_count=retry_count + 1,
-            )
+            insights = retry_result["insights"]
 
         # Failed all retries
         logger.warning(
-            f"⚠️ Quality gate failed after {retry_count + 1} attempts. "
+            f"⚠️ Quality gate failed after {attempt + 1} attempts. "
             f"Delivering with warning."
         )
         return (insights, scores, False)
@@ -4,16 +4,25 @@ Insight Search
 Search through previously generated digests and insights.
 """
 
+import asyncio
 import logging
+from collections import Counter
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from openai import AsyncOpenAI
+import numpy as np
+import orjson
 from supabase import Client
 
 from ..utils.db import get_supabase_client
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.openai_client import get_openai_client
+from ..utils.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
+# Inputs sent per embeddings request
+EMBED_BATCH_SIZE = 100
+
 
 class InsightSearch:
     """Search through past insights."""
@@ -25,6 +34,8 @@ class InsightSearch:
         openai_api_key: str,
         embedding_model: str = "text-embedding-3-small",
         embedding_dimensions: int = 1536,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        vector_store: Optional[VectorStore] = None,
     ):
         """
         Initialize insight search.
@@ -35,11 +46,17 @@ class InsightSearch:
             openai_api_key: OpenAI API key
             embedding_model: OpenAI embedding model
             embedding_dimensions: Embedding dimensions
+            embedding_cache: Embedding cache (default: on-disk cache)
+            vector_store: Local mirror of normalized insight embeddings
+                (default: memory-mapped files in the user cache dir)
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
-        self.embeddings_client = AsyncOpenAI(api_key=openai_api_key)
+        self.embeddings_client = get_openai_client(openai_api_key)
         self.embedding_model = embedding_model
         self.embedding_dimensions = embedding_dimensions
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        self._cache_model = f"{embedding_model}:{embedding_dimensions}"
+        self.vector_store = vector_store or VectorStore(dimensions=embedding_dimensions)
 
     async def search(
         self,
@@ -65,8 +82,12 @@ class InsightSearch:
         logger.info(f"Searching past insights: '{query}'")
 
         try:
-            # Get all digests for user
-            digests_query = self.db.table("generated_digests").select("*").eq("user_id", user_id)
+            # Get all digests for user (only the columns search reads)
+            digests_query = (
+                self.db.table("generated_digests")
+                .select("id, digest_date, insights")
+                .eq("user_id", user_id)
+            )
 
             # Apply date range filter
             if date_range:
@@ -75,7 +96,11 @@ class InsightSearch:
                 if "end_date" in date_range:
                     digests_query = digests_query.lte("digest_date", date_range["end_date"])
 
-            digests_result = digests_query.execute()
+            # The query embedding doesn't depend on the digests, so fetch both at once
+            digests_result, query_embedding = await asyncio.gather(
+                asyncio.to_thread(digests_query.execute),
+                self._generate_query_embedding(query),
+            )
             digests = digests_result.data if digests_result.data else []
 
             if not digests:
@@ -95,46 +120,100 @@ class InsightSearch:
             if not all_insights:
                 return []
 
-            # Generate query embedding
-            query_embedding = await self._generate_query_embedding(query)
+            # Create searchable text from each insight; empty ones score 0
+            # without being sent to the API
+            searchable_texts = [self._searchable_text(insight) for insight in all_insights]
+            embed_indices = [i for i, text in enumerate(searchable_texts) if text.strip()]
+
+            # Insight text never changes, so only embed insights seen for the
+            # first time
+            embedded_ids = await self._get_embedded_insight_ids(
+                [all_insights[i]["id"] for i in embed_indices if all_insights[i].get("id")]
+            )
+            missing = [i for i in embed_indices if all_insights[i].get("id") not in embedded_ids]
+
+            # Embed any missing insights in batched requests
+            embeddings = await self._generate_embeddings([searchable_texts[i] for i in missing])
+
+            # Normalize once so every similarity below is a plain dot product
+            query_vector = self._normalize(query_embedding[np.newaxis])[0]
+            new_embeddings = dict(zip(missing, self._normalize(embeddings)))
+            await self._store_insight_embeddings(
+                user_id,
+                [
+                    (all_insights[i], new_embeddings[i].tolist())
+                    for i in missing
+                    if all_insights[i].get("id")
+                ],
+            )
+
+            # Rank, filter and limit in Postgres when match_insights is available
+            matches = await self._match_insights(
+                user_id, query_vector.tolist(), date_range, min_feedback_score, limit
+            )
+            if matches is not None:
+                insights_by_id = {
+                    insight["id"]: insight for insight in all_insights if insight.get("id")
+                }
+                results = []
+                for match in matches:
+                    insight = insights_by_id.get(match["insight_id"])
+                    if insight is not None:
+                        insight["search_score"] = match["similarity"]
+                        results.append(insight)
+
+                logger.info(f"Found {len(results)} matching insights")
+                return results
+
+            # Fallback: score in-process (one matrix-vector product). Stored
+            # vectors come from the local memory-mapped mirror; only those it
+            # lacks are fetched from the database, then mirrored
+            new_by_id = {
+                all_insights[i]["id"]: new_embeddings[i]
+                for i in missing
+                if all_insights[i].get("id")
+            }
+            stored_ids = [
+                all_insights[i]["id"]
+                for i in embed_indices
+                if i not in new_embeddings and all_insights[i].get("id")
+            ]
+            stored = self.vector_store.get_many(stored_ids)
+            fetched = await self._load_insight_embeddings(
+                [insight_id for insight_id in stored_ids if insight_id not in stored]
+            )
+            stored.update(fetched)
+            self.vector_store.add([*new_by_id.items(), *fetched.items()])
 
-            # Score insights by semantic similarity
             for insight in all_insights:
-                # Create searchable text from insight
-                searchable_text = (
-                    f"{insight.get('title', '')} "
-                    f"{insight.get('explanation', '')} "
-                    f"{insight.get('practical_takeaway', '')}"
+                insight["search_score"] = 0.0
+            if embed_indices:
+                # An embedding the database failed to return scores 0
+                no_vector = np.zeros(self.embedding_dimensions, dtype=np.float32)
+                matrix = np.stack(
+                    [
+                        new_embeddings[i]
+                        if i in new_embeddings
+                        else stored.get(all_insights[i].get("id"), no_vector)
+                        for i in embed_indices
+                    ]
                 )
+                # Rows loaded from storage are renormalized too, so a zero or
+                # legacy unnormalized vector can't score outside [-1, 1]
+                scores = self._normalize(matrix) @ query_vector
+                for i, score in zip(embed_indices, scores.tolist()):
+                    all_insights[i]["search_score"] = score
 
-                # Generate embedding for insight
-                insight_embedding = await self._generate_query_embedding(searchable_text)
-
-                # Calculate cosine similarity
-                similarity = self._cosine_similarity(query_embedding, insight_embedding)
-                insight["search_score"] = similarity
-
-            # Filter by feedback if requested
+            # Filter by feedback if requested (one query for all insights)
             if min_feedback_score is not None:
-                # Get feedback for insights
-                filtered_insights = []
-                for insight in all_insights:
-                    feedback_result = (
-                        self.db.table("feedback")
-                        .select("type")
-                        .eq("insight_id", insight.get("id", ""))
-                        .execute()
-                    )
-
-                    feedbacks = feedback_result.data if feedback_result.data else []
-
-                    # Count helpful feedback
-                    helpful_count = sum(1 for f in feedbacks if f["type"] == "helpful")
-
-                    if helpful_count >= min_feedback_score:
-                        filtered_insights.append(insight)
-
-                all_insights = filtered_insights
+                helpful_counts = await self._count_helpful_feedback(
+                    [insight["id"] for insight in all_insights if insight.get("id")]
+                )
+                all_insights = [
+                    insight
+                    for insight in all_insights
+                    if helpful_counts[insight.get("id", "")] >= min_feedback_score
+                ]
 
             # Sort by search score
             all_insights.sort(key=lambda x: x["search_score"], reverse=True)
@@ -149,27 +228,220 @@ class InsightSearch:
             logger.error(f"Error searching insights: {e}", exc_info=True)
             return []
 
-    async def _generate_query_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text."""
-        response = await self.embeddings_client.embeddings.create(
-            model=self.embedding_model,
-            input=text,
-            dimensions=self.embedding_dimensions,
+    @staticmethod
+    def _searchable_text(insight: Dict[str, Any]) -> str:
+        """Text used to embed an insight for search."""
+        return (
+            f"{insight.get('title', '')} "
+            f"{insight.get('explanation', '')} "
+            f"{insight.get('practical_takeaway', '')}"
+        )
+
+    async def _match_insights(
+        self,
+        user_id: str,
+        query_embedding: List[float],
+        date_range: Optional[Dict[str, str]],
+        min_feedback_score: Optional[int],
+        limit: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run the match_insights RPC (pgvector kNN over stored insight embeddings).
+
+        Args:
+            user_id: User ID
+            query_embedding: Normalized query embedding
+            date_range: Optional date range filter (start_date, end_date)
+            min_feedback_score: Minimum helpful feedback count
+            limit: Maximum results to return
+
+        Returns:
+            Rows with insight_id and similarity, or None if the RPC failed
+        """
+        date_range = date_range or {}
+        try:
+            result = await asyncio.to_thread(
+                self.db.rpc(
+                    "match_insights",
+                    {
+                        "query_embedding": query_embedding,
+                        "filter_user_id": user_id,
+                        "start_date": date_range.get("start_date"),
+                        "end_date": date_range.get("end_date"),
+                        "min_feedback_score": min_feedback_score,
+                        "match_count": limit,
+                    },
+                ).execute
+            )
+        except Exception as e:
+            logger.warning(f"match_insights RPC failed, ranking in-process: {e}")
+            return None
+
+        return result.data or []
+
+    async def _count_helpful_feedback(self, insight_ids: List[str]) -> Counter:
+        """
+        Count helpful feedback per insight in a single query.
+
+        Args:
+            insight_ids: Insight IDs to count feedback for
+
+        Returns:
+            Counter of insight_id to helpful feedback count
+        """
+        if not insight_ids:
+            return Counter()
+
+        feedback_result = await asyncio.to_thread(
+            self.db.table("feedback")
+            .select("insight_id")
+            .in_("insight_id", insight_ids)
+            .eq("type", "helpful")
+            .execute
         )
-        return response.data[0].embedding
+        return Counter(row["insight_id"] for row in (feedback_result.data or []))
+
+    async def _get_embedded_insight_ids(self, insight_ids: List[str]) -> set[str]:
+        """Return the subset of insight IDs that already have a stored embedding."""
+        if not insight_ids:
+            return set()
+
+        try:
+            result = await asyncio.to_thread(
+                self.db.table("insight_embeddings")
+                .select("insight_id")
+                .in_("insight_id", insight_ids)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"Could not check stored insight embeddings: {e}")
+            return set()
+
+        return {row["insight_id"] for row in (result.data or [])}
+
+    async def _load_insight_embeddings(self, insight_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Fetch stored embeddings for insights.
+
+        Args:
+            insight_ids: Insight IDs to look up
+
+        Returns:
+            Mapping of insight_id to float32 embedding (missing IDs are omitted)
+        """
+        if not insight_ids:
+            return {}
+
+        try:
+            result = await asyncio.to_thread(
+                self.db.table("insight_embeddings")
+                .select("insight_id, embedding")
+                .in_("insight_id", insight_ids)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"Could not load stored insight embeddings: {e}")
+            return {}
+
+        # pgvector columns come back as "[x,y,...]" strings
+        return {
+            row["insight_id"]: np.asarray(
+                orjson.loads(row["embedding"])
+                if isinstance(row["embedding"], str)
+                else row["embedding"],
+                dtype=np.float32,
+            )
+            for row in (result.data or [])
+        }
+
+    async def _store_insight_embeddings(
+        self,
+        user_id: str,
+        items: List[tuple[Dict[str, Any], List[float]]],
+    ) -> None:
+        """
+        Persist newly generated insight embeddings (best-effort).
 
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        import math
+        Args:
+            user_id: User ID
+            items: (insight, embedding) pairs
+        """
+        if not items:
+            return
 
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(b * b for b in vec2))
+        try:
+            await asyncio.to_thread(
+                self.db.table("insight_embeddings").upsert(
+                    [
+                        {
+                            "insight_id": insight["id"],
+                            "user_id": user_id,
+                            "digest_id": insight.get("digest_id"),
+                            "embedding": embedding,
+                        }
+                        for insight, embedding in items
+                    ]
+                ).execute
+            )
+            logger.debug(f"Stored embeddings for {len(items)} insights")
+        except Exception as e:
+            logger.warning(f"Could not store insight embeddings: {e}")
+
+    async def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with one request per EMBED_BATCH_SIZE inputs, run concurrently.
 
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+        Each distinct text is embedded at most once: repeats within `texts` are
+        collapsed and previously embedded texts are served from the cache.
 
-        return dot_product / (magnitude1 * magnitude2)
+        Returns:
+            (len(texts), embedding_dimensions) float32 matrix
+        """
+        vectors: Dict[str, np.ndarray] = {}
+        to_embed = []
+        for text in dict.fromkeys(texts):
+            cached = self.embedding_cache.get(self._cache_model, text)
+            if cached is not None:
+                vectors[text] = cached
+            else:
+                to_embed.append(text)
+
+        batches = [
+            to_embed[start : start + EMBED_BATCH_SIZE]
+            for start in range(0, len(to_embed), EMBED_BATCH_SIZE)
+        ]
+        responses = await asyncio.gather(
+            *(
+                self.embeddings_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=batch,
+                    dimensions=self.embedding_dimensions,
+                )
+                for batch in batches
+            )
+        )
+        embedded = [
+            item.embedding
+            for response in responses
+            for item in sorted(response.data, key=lambda d: d.index)
+        ]
+        for text, embedding in zip(to_embed, embedded):
+            vectors[text] = np.asarray(embedding, dtype=np.float32)
+            self.embedding_cache.set(self._cache_model, text, vectors[text])
+
+        if not texts:
+            return np.empty((0, self.embedding_dimensions), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts])
+
+    async def _generate_query_embedding(self, text: str) -> np.ndarray:
+        """Generate float32 embedding for text."""
+        return (await self._generate_embeddings([text]))[0]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale each row of an (N, D) matrix to unit length (zero rows stay zero)."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms != 0)
 
 
 async def test_insight_search(
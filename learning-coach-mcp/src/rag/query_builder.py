@@ -4,8 +4,10 @@ Query Builder
 Constructs semantic search queries from user's learning context.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from supabase import Client
 
@@ -13,6 +15,26 @@ from ..utils.db import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Query hints per difficulty level
+DIFFICULTY_HINTS = {
+    "beginner": "I am a beginner, so I need foundational explanations with examples.",
+    "intermediate": (
+        "I have intermediate knowledge, so I need practical implementation details."
+    ),
+    "advanced": (
+        "I have advanced knowledge, so I need deep technical insights and edge cases."
+    ),
+}
+
+REQUEST_HINT = (
+    "Find recent articles that explain these topics with practical examples, "
+    "implementation details, and real-world applications. "
+    "Prefer technical depth over high-level overviews."
+)
+
+# How long a fetched learning context is reused for the same user
+CONTEXT_CACHE_TTL_SECONDS = 60
+
 
 class QueryBuilder:
     """Builds semantic search queries from learning context."""
@@ -26,6 +48,8 @@ class QueryBuilder:
             supabase_key: Supabase API key
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
+        # user_id -> (fetched_at, context); per instance so users never share entries
+        self._context_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 
     async def build_query_from_context(
         self,
@@ -72,19 +96,26 @@ class QueryBuilder:
         Returns:
             Learning context dictionary or None
         """
+        cached = self._context_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < CONTEXT_CACHE_TTL_SECONDS:
+            return cached[1]
+
         try:
-            result = (
+            result = await asyncio.to_thread(
                 self.db.table("learning_progress")
-                .select("*")
+                .select(
+                    "current_week, current_topics, difficulty_level, "
+                    "learning_goals, completed_weeks, metadata"
+                )
                 .eq("user_id", user_id)
                 .single()
-                .execute()
+                .execute
             )
 
             if not result.data:
                 return None
 
-            return {
+            context = {
                 "current_week": result.data.get("current_week"),
                 "current_topics": result.data.get("current_topics", []),
                 "difficulty_level": result.data.get("difficulty_level", "intermediate"),
@@ -92,11 +123,25 @@ class QueryBuilder:
                 "completed_weeks": result.data.get("completed_weeks", []),
                 "metadata": result.data.get("metadata", {}),
             }
+            self._context_cache[user_id] = (time.monotonic(), context)
+            return context
 
         except Exception as e:
             logger.error(f"Error fetching learning context: {e}")
             return None
 
+    def invalidate_learning_context(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop cached learning context after it has been updated.
+
+        Args:
+            user_id: User whose context changed (None clears all users)
+        """
+        if user_id is None:
+            self._context_cache.clear()
+        else:
+            self._context_cache.pop(user_id, None)
+
     def _construct_query_text(
         self,
         context: Dict[str, Any],
@@ -112,21 +157,24 @@ class QueryBuilder:
         Returns:
             Query text string
         """
+        current_week = context.get("current_week")
+        topics = context.get("current_topics")
+        difficulty = context.get("difficulty_level")
+        learning_goals = context.get("learning_goals")
+
         # If user provided explicit query, enhance it with context
         if explicit_query:
             query_parts = [explicit_query]
 
             # Add context hints
-            if context.get("current_topics"):
-                topics_str = ", ".join(context["current_topics"][:3])
+            if topics:
                 query_parts.append(
-                    f"Related to my current learning topics: {topics_str}."
+                    f"Related to my current learning topics: {', '.join(topics[:3])}."
                 )
 
-            if context.get("difficulty_level"):
-                level = context["difficulty_level"]
+            if difficulty:
                 query_parts.append(
-                    f"I'm at {level} level, so provide {level}-appropriate depth."
+                    f"I'm at {difficulty} level, so provide {difficulty}-appropriate depth."
                 )
 
             return " ".join(query_parts)
@@ -135,45 +183,28 @@ class QueryBuilder:
         query_parts = []
 
         # Week and bootcamp info
-        if context.get("current_week"):
-            query_parts.append(
-                f"I am in Week {context['current_week']} of an AI bootcamp."
-            )
+        if current_week:
+            query_parts.append(f"I am in Week {current_week} of an AI bootcamp.")
 
         # Topics
-        if context.get("current_topics"):
-            topics = context["current_topics"]
+        if topics:
             if len(topics) == 1:
-                query_parts.append(f"I am learning about {topics[0]}.")
+                topics_str = topics[0]
             else:
                 topics_str = ", ".join(topics[:-1]) + f", and {topics[-1]}"
-                query_parts.append(f"I am learning about {topics_str}.")
+            query_parts.append(f"I am learning about {topics_str}.")
 
         # Difficulty level
-        difficulty = context.get("difficulty_level", "intermediate")
-        if difficulty == "beginner":
-            query_parts.append(
-                "I am a beginner, so I need foundational explanations with examples."
-            )
-        elif difficulty == "intermediate":
-            query_parts.append(
-                "I have intermediate knowledge, so I need practical implementation details."
-            )
-        elif difficulty == "advanced":
-            query_parts.append(
-                "I have advanced knowledge, so I need deep technical insights and edge cases."
-            )
+        difficulty_hint = DIFFICULTY_HINTS.get(context.get("difficulty_level", "intermediate"))
+        if difficulty_hint:
+            query_parts.append(difficulty_hint)
 
         # Learning goals
-        if context.get("learning_goals"):
-            query_parts.append(f"My goal is to: {context['learning_goals']}.")
+        if learning_goals:
+            query_parts.append(f"My goal is to: {learning_goals}.")
 
         # Request type
-        query_parts.append(
-            "Find recent articles that explain these topics with practical examples, "
-            "implementation details, and real-world applications. "
-            "Prefer technical depth over high-level overviews."
-        )
+        query_parts.append(REQUEST_HINT)
 
         query_text = " ".join(query_parts)
 
@@ -5,13 +5,16 @@ Retrieves relevant content chunks using vector similarity search
 combined with recency and source priority scoring.
 """
 
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
+import numpy as np
 from supabase import Client
 
 from ..utils.db import get_supabase_client
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.openai_client import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,7 @@ class VectorRetriever:
         openai_api_key: str,
         embedding_model: str = "text-embedding-3-small",
         embedding_dimensions: int = 1536,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
         """
         Initialize vector retriever.
@@ -36,11 +40,13 @@ class VectorRetriever:
             openai_api_key: OpenAI API key
             embedding_model: OpenAI embedding model
             embedding_dimensions: Embedding dimensions
+            embedding_cache: Query embedding cache (default: on-disk cache)
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
-        self.embeddings_client = AsyncOpenAI(api_key=openai_api_key)
+        self.embeddings_client = get_openai_client(openai_api_key)
         self.embedding_model = embedding_model
         self.embedding_dimensions = embedding_dimensions
+        self.embedding_cache = embedding_cache or EmbeddingCache()
 
     async def retrieve(
         self,
@@ -108,7 +114,7 @@ class VectorRetriever:
 
         return diverse_chunks
 
-    async def _generate_query_embedding(self, query: str) -> List[float]:
+    async def _generate_query_embedding(self, query: str) -> np.ndarray:
         """
         Generate embedding for search query.
 
@@ -116,19 +122,29 @@ class VectorRetriever:
             query: Query text
 
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
+        # Queries are templated from learning context and repeat across
+        # regenerations, so check the persistent cache first
+        cache_model = f"{self.embedding_model}:{self.embedding_dimensions}"
+        cached = self.embedding_cache.get(cache_model, query)
+        if cached is not None:
+            logger.debug("Query embedding served from cache")
+            return cached
+
         response = await self.embeddings_client.embeddings.create(
             model=self.embedding_model,
             input=query,
             dimensions=self.embedding_dimensions,
         )
 
-        return response.data[0].embedding
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        self.embedding_cache.set(cache_model, query, embedding)
+        return embedding
 
     async def _vector_search(
         self,
-        query_embedding: List[float],
+        query_embedding: np.ndarray,
         user_id: str,
         match_count: int,
         similarity_threshold: float,
@@ -147,15 +163,17 @@ class VectorRetriever:
         """
         try:
             # Call Supabase RPC function
-            result = self.db.rpc(
-                "match_embeddings",
-                {
-                    "query_embedding": query_embedding,
-                    "match_threshold": similarity_threshold,
-                    "match_count": match_count,
-                    "filter_user_id": user_id,
-                },
-            ).execute()
+            result = await asyncio.to_thread(
+                self.db.rpc(
+                    "match_embeddings",
+                    {
+                        "query_embedding": query_embedding.tolist(),
+                        "match_threshold": similarity_threshold,
+                        "match_count": match_count,
+                        "filter_user_id": user_id,
+                    },
+                ).execute
+            )
 
             chunks = result.data if result.data else []
 
@@ -185,40 +203,72 @@ class VectorRetriever:
         Returns:
             Chunks sorted by hybrid score
         """
-        now = datetime.now()
+        if not chunks:
+            return chunks
 
-        for chunk in chunks:
-            # Similarity score (already 0-1 from cosine similarity)
-            similarity = chunk["similarity"]
-
-            # Recency factor (0-1, higher for newer content)
-            published_at = datetime.fromisoformat(chunk["published_at"])
-            days_old = (now - published_at).days
-            recency_factor = max(0, 1 - (days_old / 30))  # Decay over 30 days
-
-            # Priority factor (0-1, normalized from 1-5 scale)
-            priority_factor = chunk["source_priority"] / 5.0
-
-            # Combined hybrid score
-            hybrid_score = (
-                similarity_weight * similarity
-                + recency_weight * recency_factor
-                + priority_weight * priority_factor
-            )
+        # Similarity score (already 0-1 from cosine similarity)
+        similarity = np.fromiter(
+            (c["similarity"] for c in chunks), dtype=np.float64, count=len(chunks)
+        )
 
+        # Factors with a zero weight can't change the score, so skip computing
+        # them (recency needs a timestamp parse per chunk)
+        zeros = np.zeros(len(chunks))
+
+        # Recency factor (0-1, higher for newer content). Timestamps come back
+        # from Postgres in UTC, so the offset is dropped before parsing
+        if recency_weight:
+            published_at = np.array(
+                [c["published_at"][:19] for c in chunks], dtype="datetime64[s]"
+            )
+            now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "s")
+            days_old = (now - published_at) // np.timedelta64(1, "D")
+            recency_factor = np.maximum(0, 1 - days_old / 30)  # Decay over 30 days
+        else:
+            recency_factor = zeros
+
+        # Priority factor (0-1, normalized from 1-5 scale)
+        if priority_weight:
+            priority_factor = (
+                np.fromiter(
+                    (c["source_priority"] for c in chunks), dtype=np.float64, count=len(chunks)
+                )
+                / 5.0
+            )
+        else:
+            priority_factor = zeros
+
+        # Combined hybrid score
+        hybrid_score = similarity_weight * similarity
+        if recency_weight:
+            hybrid_score += recency_weight * recency_factor
+        if priority_weight:
+            hybrid_score += priority_weight * priority_factor
+
+        for chunk, sim, recency, priority, hybrid in zip(
+            chunks,
+            similarity.tolist(),
+            recency_factor.tolist(),
+            priority_factor.tolist(),
+            hybrid_score.tolist(),
+        ):
             # Store individual scores for debugging
             chunk["scores"] = {
-                "similarity": similarity,
-                "recency": recency_factor,
-                "priority": priority_factor,
-                "hybrid": hybrid_score,
+                "similarity": sim,
+                "recency": recency,
+                "priority": priority,
+                "hybrid": hybrid,
             }
-            chunk["final_score"] = hybrid_score
+            chunk["final_score"] = hybrid
 
-        # Sort by hybrid score (descending)
-        chunks.sort(key=lambda x: x["final_score"], reverse=True)
+        # Similarity alone keeps the RPC's order, which is already by similarity
+        if not recency_weight and not priority_weight and similarity_weight >= 0:
+            return chunks
+
+        # Sort by hybrid score (descending); stable, so ties keep similarity order
+        order = np.argsort(-hybrid_score, kind="stable")
 
-        return chunks
+        return [chunks[i] for i in order]
 
     def _ensure_source_diversity(
         self,
@@ -240,12 +290,12 @@ class VectorRetriever:
         if not chunks:
             return []
 
-        # Track sources seen
+        # One pass: the best chunk of each new source goes first; repeats are
+        # kept (at most top_k) in score order to fill any remaining slots
         seen_sources = set()
         diverse_chunks = []
         remaining_chunks = []
 
-        # First pass: ensure at least one chunk from each source
         for chunk in chunks:
             source_id = chunk["source_id"]
 
@@ -256,15 +306,10 @@ class VectorRetriever:
                 # Stop if we have enough sources and chunks
                 if len(seen_sources) >= min_sources and len(diverse_chunks) >= top_k:
                     break
-            else:
+            elif len(remaining_chunks) < top_k:
                 remaining_chunks.append(chunk)
 
-        # Second pass: fill remaining slots with highest-scoring chunks
-        if len(diverse_chunks) < top_k:
-            needed = top_k - len(diverse_chunks)
-            diverse_chunks.extend(remaining_chunks[:needed])
-
-        return diverse_chunks[:top_k]
+        return (diverse_chunks + remaining_chunks)[:top_k]
 
     async def retrieve_with_context(
         self,
@@ -299,7 +344,7 @@ class VectorRetriever:
             "total_chunks": len(chunks),
             "sources": list(set(c["source_id"] for c in chunks)),
             "avg_similarity": (
-                sum(c["similarity"] for c in chunks) / len(chunks) if chunks else 0
+                float(np.mean([c["similarity"] for c in chunks])) if chunks else 0
             ),
         }
 
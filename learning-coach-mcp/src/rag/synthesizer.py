@@ -5,22 +5,218 @@ Synthesizes personalized learning insights from retrieved content
 using Claude with first-principles thinking and Feynman technique.
 """
 
+import asyncio
 import logging
-import json
-from typing import List, Dict, Any, Optional
+import math
+import re
+import time
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+import orjson
 from anthropic import AsyncAnthropic
 
 logger = logging.getLogger(__name__)
 
+# Message Batches polling (scheduled digests): exponential backoff between
+# status checks, falling back to a direct request after the timeout
+BATCH_POLL_INITIAL_SECONDS = 30
+BATCH_POLL_MAX_SECONDS = 300
+BATCH_TIMEOUT_SECONDS = 2 * 3600
+
+# JSON extraction from Claude responses: fenced code block, then any raw
+# object (found by _find_json_span)
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# One retrieved chunk in the synthesis context
+_SOURCE_TEMPLATE = """## Source {i}: {title}
+
+**Author**: {author}
+**URL**: {url}
+**Published**: {published}
+**Relevance Score**: {similarity:.3f}
+
+### Content:
+{text}
+
+---
+"""
+
+# Parallel synthesis: chunks are split into up to this many concurrent
+# requests, but only when there are enough chunks to give each shard context
+SYNTHESIS_MAX_SHARDS = 4
+SYNTHESIS_MIN_SHARD_CHUNKS = 6
+
+# Insights per synthesis call, and the output token budget per request:
+# a fixed allowance for the JSON wrapper plus room for each insight
+MAX_INSIGHTS = 10
+MAX_TOKENS_BASE = 500
+MAX_TOKENS_PER_INSIGHT = 900
+
+# Sampling temperature: deterministic first attempts; quality-gate (strict)
+# retries sample a little so they don't reproduce the rejected output
+SYNTHESIS_TEMPERATURE = 0.0
+RETRY_TEMPERATURE = 0.3
+
+# Assistant prefill: the response continues a JSON object, so it parses
+# directly without the fence/scan fallbacks in _extract_json
+RESPONSE_PREFILL = "{"
+
+SYSTEM_PROMPT = """You are an expert AI learning coach with deep expertise in educational theory and first-principles thinking. Your role is to help learners understand complex AI/ML concepts by:
+
+1. **First-Principles Thinking**: Break down concepts to their fundamentals before building up
+2. **Feynman Technique**: Explain as if teaching someone without prior knowledge, then add depth
+3. **Practical Application**: Always connect theory to real-world implementation
+4. **Active Learning**: Provide actionable takeaways, not just passive information
+5. **Source Fidelity**: Maintain accuracy to source material while synthesizing
+
+Educational Principles:
+- Start with "WHY" before "HOW" - motivation drives understanding
+- Use analogies only when they clarify, never when they obscure
+- Prefer concrete examples over abstract descriptions
+- Connect new concepts to prior knowledge explicitly
+- Highlight common misconceptions and pitfalls
+- Provide progressive disclosure: overview → details → nuances
+
+Quality Standards:
+- Every insight must be grounded in the provided source material
+- Citations must be accurate and specific
+- Explanations must be self-contained (understandable without external references)
+- Practical takeaways must be immediately actionable
+- Tone should match the learner's level (avoid condescension or overwhelming jargon)"""
+
+# Static part of the task; the per-call request (count, level, goal) is in the user prompt
+TASK_INSTRUCTIONS = """# Task
+
+The learner will share their learning context, a search query, and retrieved content, and ask for a number of personalized learning insights based on that content and tailored to their learning context.
+
+For each insight, provide:
+
+1. **Title**: Concise, specific title (max 100 characters)
+2. **Relevance Reason**: Brief explanation of why this insight matters for the learner's current learning (50-100 words)
+3. **Explanation**: Main educational content using first-principles approach (300-500 words)
+   - Start with fundamentals (the "why")
+   - Build up to implementation (the "how")
+   - Include concrete examples
+   - Connect to the learner's goals
+   - Highlight key takeaways
+4. **Practical Takeaway**: One actionable item the learner can do immediately (50-100 words)
+   - Should be specific and concrete
+   - Should align with their skill level
+   - Should advance toward their learning goal
+5. **Source Attribution**: Full source details (title, author, URL, date)
+
+# Output Format
+
+Return a JSON object matching this exact schema:
+
+```json
+{
+  "insights": [
+    {
+      "title": "string (max 100 chars)",
+      "relevance_reason": "string (50-100 words)",
+      "explanation": "string (300-500 words, first-principles approach)",
+      "practical_takeaway": "string (50-100 words, actionable)",
+      "source": {
+        "title": "string (exact source title)",
+        "author": "string",
+        "url": "string (full URL)",
+        "published_date": "YYYY-MM-DD"
+      },
+      "metadata": {
+        "confidence": 0.0-1.0,
+        "estimated_read_time": integer (minutes),
+        "difficulty_level": "beginner|intermediate|advanced",
+        "tags": ["array", "of", "relevant", "tags"]
+      }
+    }
+  ]
+}
+```
+
+IMPORTANT:
+- Return ONLY valid JSON, no additional text
+- Ensure all insights are unique and cover different aspects
+- Base all content strictly on the provided sources"""
+
+STRICT_MODE_PROMPT = """STRICT MODE ACTIVATED:
+- Be extremely precise and accurate - no speculation beyond source material
+- Reduce creativity in explanations - stick closely to source content
+- Emphasize source fidelity above all else
+- If uncertain about any detail, omit rather than infer
+- Double-check all technical claims against source material"""
+
+
+def _find_json_span(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} span in text, in a single linear pass.
+
+    Braces inside JSON strings (including escaped quotes) are ignored.
+
+    Args:
+        text: Text that may contain a JSON object
+
+    Returns:
+        The object's source text, or None if no balanced object is found
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+@lru_cache(maxsize=2)
+def _system_prompt_blocks(stricter: bool) -> Tuple[Dict[str, Any], ...]:
+    """
+    System prompt content blocks, built once per process for each mode.
+
+    Every block is static, with the strict-mode block last. The blocks carry no
+    cache_control: together they are ~1K tokens, at or under the model's
+    1024-token prompt-caching minimum, below which a breakpoint is silently
+    ignored. Callers must not mutate the returned blocks.
+    """
+    blocks = [
+        {"type": "text", "text": SYSTEM_PROMPT},
+        {"type": "text", "text": TASK_INSTRUCTIONS},
+    ]
+
+    if stricter:
+        blocks.append({"type": "text", "text": STRICT_MODE_PROMPT})
+
+    return tuple(blocks)
+
 
 class EducationalSynthesizer:
     """Synthesizes educational insights using Claude."""
 
+    __slots__ = ("client", "model", "batch_timeout_seconds", "_request_slots")
+
     def __init__(
         self,
         api_key: str,
         model: str = "claude-sonnet-4-5-20250929",
+        batch_timeout_seconds: float = BATCH_TIMEOUT_SECONDS,
+        client: Optional[AsyncAnthropic] = None,
     ):
         """
         Initialize synthesizer.
@@ -28,9 +224,15 @@ class EducationalSynthesizer:
         Args:
             api_key: Anthropic API key
             model: Claude model to use
+            batch_timeout_seconds: How long to wait on a message batch before
+                falling back to a direct request (default: 2 hours)
+            client: Shared Anthropic client (default: a new client for api_key)
         """
-        self.client = AsyncAnthropic(api_key=api_key)
+        self.client = client or AsyncAnthropic(api_key=api_key)
         self.model = model
+        self.batch_timeout_seconds = batch_timeout_seconds
+        # Caps concurrent requests from this synthesizer (RPM limits)
+        self._request_slots = asyncio.Semaphore(SYNTHESIS_MAX_SHARDS)
 
     async def synthesize_insights(
         self,
@@ -39,6 +241,7 @@ class EducationalSynthesizer:
         query: str,
         num_insights: int = 7,
         stricter: bool = False,
+        batch: bool = False,
     ) -> Dict[str, Any]:
         """
         Synthesize personalized learning insights from retrieved content.
@@ -49,21 +252,185 @@ class EducationalSynthesizer:
             query: Original search query
             num_insights: Number of insights to generate (default: 7)
             stricter: Use stricter prompt for higher quality (default: False)
+            batch: Send through the Message Batches API (half price, slower;
+                for scheduled, non-interactive runs) (default: False)
 
         Returns:
             Dictionary with insights array and metadata
         """
+        clamped = max(1, min(MAX_INSIGHTS, int(num_insights)))
+        if clamped != num_insights:
+            logger.warning(f"num_insights={num_insights} out of range, using {clamped}")
+            num_insights = clamped
+
         logger.info(f"Synthesizing {num_insights} insights from {len(retrieved_chunks)} chunks")
 
         if not retrieved_chunks:
             logger.warning("No chunks provided for synthesis")
             return {"insights": [], "metadata": {"error": "No content to synthesize"}}
 
+        # Interactive runs fan out over chunk shards so each call decodes fewer
+        # tokens; batch runs aren't latency-bound and stay a single request.
+        # Chunks keep their overall rank as source number in every shard.
+        numbered_chunks = list(enumerate(retrieved_chunks, 1))
+        shards = [numbered_chunks] if batch else self._shard_chunks(numbered_chunks)
+        insights_per_shard = math.ceil(num_insights / len(shards))
+        system_prompt = self._build_system_prompt(stricter=stricter)
+        temperature = RETRY_TEMPERATURE if stricter else SYNTHESIS_TEMPERATURE
+
+        shard_results = await asyncio.gather(
+            *(
+                self._synthesize_shard(
+                    numbered_chunks=shard,
+                    learning_context=learning_context,
+                    query=query,
+                    num_insights=insights_per_shard,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    batch=batch,
+                )
+                for shard in shards
+            ),
+            return_exceptions=True,
+        )
+
+        # One timestamp for the whole result (metadata, IDs, generated_at)
+        now = datetime.now()
+        generated_at = now.isoformat()
+
+        insights_data = {"insights": []}
+        errors = []
+        for result in shard_results:
+            if isinstance(result, Exception):
+                logger.error(f"Error synthesizing insights: {result}", exc_info=result)
+                errors.append(str(result))
+                continue
+            insights_data["insights"].extend(result.get("insights", []))
+
+        if errors and not insights_data["insights"]:
+            return {
+                "insights": [],
+                "metadata": {
+                    "error": errors[0],
+                    "generated_at": generated_at,
+                },
+            }
+
+        if len(shards) > 1:
+            insights_data["insights"] = self._dedupe_shard_insights(insights_data["insights"])
+        insights_data["insights"] = insights_data["insights"][:num_insights]
+
+        # Validate and enrich insights
+        insights = self._validate_and_enrich_insights(
+            insights_data=insights_data,
+            retrieved_chunks=retrieved_chunks,
+            now=now,
+        )
+
+        logger.info(
+            f"Successfully synthesized {len(insights)} insights from {len(shards)} shard(s)"
+        )
+
+        return {
+            "insights": insights,
+            "metadata": {
+                "num_chunks_used": len(retrieved_chunks),
+                "num_shards": len(shards),
+                "model": self.model,
+                "temperature": temperature,
+                "generated_at": generated_at,
+                "query": query,
+            },
+        }
+
+    def _shard_chunks(
+        self, chunks: List[Tuple[int, Dict[str, Any]]]
+    ) -> List[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Split chunks into up to SYNTHESIS_MAX_SHARDS groups for parallel synthesis.
+
+        Chunks are dealt round-robin in ranked order, so every shard gets a
+        similar mix of strong and weak matches.
+
+        Args:
+            chunks: Ranked retrieved chunks with their source numbers
+
+        Returns:
+            List of chunk groups (a single group for small inputs)
+        """
+        if len(chunks) < SYNTHESIS_MIN_SHARD_CHUNKS:
+            return [chunks]
+
+        num_shards = min(SYNTHESIS_MAX_SHARDS, len(chunks) // 3)
+        return [chunks[i::num_shards] for i in range(num_shards)]
+
+    @staticmethod
+    def _dedupe_shard_insights(insights: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop repeats from insights synthesized by independent shards.
+
+        Shards answer the same query, so they can land on the same point.
+        Insights whose title was already seen are dropped; ones citing an
+        already-used source move behind those with new sources, so trimming to
+        the requested count keeps as many distinct sources as possible.
+
+        Args:
+            insights: Insights from all shards, in shard order
+
+        Returns:
+            Deduplicated insights
+        """
+        seen_titles = set()
+        seen_sources = set()
+        new_source = []
+        repeat_source = []
+        for insight in insights:
+            title = " ".join(str(insight.get("title", "")).casefold().split())
+            if title in seen_titles:
+                continue
+            if title:
+                seen_titles.add(title)
+
+            source = insight.get("source")
+            url = source.get("url") if isinstance(source, dict) else None
+            if url and url in seen_sources:
+                repeat_source.append(insight)
+                continue
+            if url:
+                seen_sources.add(url)
+            new_source.append(insight)
+
+        return new_source + repeat_source
+
+    async def _synthesize_shard(
+        self,
+        numbered_chunks: List[Tuple[int, Dict[str, Any]]],
+        learning_context: Dict[str, Any],
+        query: str,
+        num_insights: int,
+        system_prompt: List[Dict[str, Any]],
+        temperature: float,
+        batch: bool,
+    ) -> Dict[str, Any]:
+        """
+        Run one synthesis request over a group of chunks.
+
+        Args:
+            numbered_chunks: (source number, chunk) pairs for this request
+            learning_context: Learning context metadata
+            query: Search query
+            num_insights: Number of insights to request
+            system_prompt: System prompt blocks
+            temperature: Sampling temperature
+            batch: Send through the Message Batches API
+
+        Returns:
+            Parsed JSON response (raises on API or parse errors)
+        """
         # Build context from chunks
-        context_text = self._build_context_text(retrieved_chunks)
+        context_text = self._build_context_text(numbered_chunks)
 
-        # Construct prompts
-        system_prompt = self._build_system_prompt(stricter=stricter)
+        # Construct prompt
         user_prompt = self._build_user_prompt(
             context_text=context_text,
             learning_context=learning_context,
@@ -72,94 +439,95 @@ class EducationalSynthesizer:
         )
 
         # Call Claude
-        try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=8000,
-                temperature=0.3,  # Lower temperature for consistency
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-
-            # Parse JSON response
-            response_text = response.content[0].text
-
-            # Extract JSON from response (may be wrapped in markdown code block)
-            insights_data = self._extract_json(response_text)
-
-            # Validate and enrich insights
-            insights = self._validate_and_enrich_insights(
-                insights_data=insights_data,
-                retrieved_chunks=retrieved_chunks,
-            )
+        params = {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS_BASE + MAX_TOKENS_PER_INSIGHT * num_insights,
+            "temperature": temperature,
+            "system": system_prompt,
+            "messages": [
+                {"role": "user", "content": user_prompt},
+                {"role": "assistant", "content": RESPONSE_PREFILL},
+            ],
+        }
 
-            logger.info(f"Successfully synthesized {len(insights)} insights")
+        async with self._request_slots:
+            response = None
+            if batch:
+                response = await self._create_message_batched(params)
+            if response is None:
+                # Stream so the connection carries data throughout the long
+                # decode instead of idling until the whole response is ready
+                async with self.client.messages.stream(**params) as stream:
+                    response = await stream.get_final_message()
 
-            return {
-                "insights": insights,
-                "metadata": {
-                    "num_chunks_used": len(retrieved_chunks),
-                    "model": self.model,
-                    "temperature": 0.3,
-                    "generated_at": datetime.now().isoformat(),
-                    "query": query,
-                },
-            }
+        # Parse JSON response (the prefill is not echoed back)
+        response_text = RESPONSE_PREFILL + response.content[0].text
 
-        except Exception as e:
-            logger.error(f"Error synthesizing insights: {e}", exc_info=True)
-            return {
-                "insights": [],
-                "metadata": {
-                    "error": str(e),
-                    "generated_at": datetime.now().isoformat(),
-                },
-            }
+        # Extract JSON from response (may be wrapped in markdown code block)
+        return self._extract_json(response_text)
 
-    def _build_system_prompt(self, stricter: bool = False) -> str:
+    async def _create_message_batched(self, params: Dict[str, Any]) -> Optional[Any]:
         """
-        Build system prompt for Claude.
+        Run one Messages request through the Message Batches API.
 
         Args:
-            stricter: Use stricter guidelines for accuracy
+            params: messages.create keyword arguments
 
         Returns:
-            System prompt string
+            The resulting Message, or None if the batch failed or timed out
+            (the caller then falls back to a direct request)
         """
-        base_prompt = """You are an expert AI learning coach with deep expertise in educational theory and first-principles thinking. Your role is to help learners understand complex AI/ML concepts by:
+        custom_id = f"insights_{int(time.time() * 1000)}"
 
-1. **First-Principles Thinking**: Break down concepts to their fundamentals before building up
-2. **Feynman Technique**: Explain as if teaching someone without prior knowledge, then add depth
-3. **Practical Application**: Always connect theory to real-world implementation
-4. **Active Learning**: Provide actionable takeaways, not just passive information
-5. **Source Fidelity**: Maintain accuracy to source material while synthesizing
+        try:
+            message_batch = await self.client.messages.batches.create(
+                requests=[{"custom_id": custom_id, "params": params}]
+            )
+            logger.info(f"Submitted message batch {message_batch.id}")
+
+            deadline = time.monotonic() + self.batch_timeout_seconds
+            delay = BATCH_POLL_INITIAL_SECONDS
+            while message_batch.processing_status != "ended":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(
+                        f"Message batch {message_batch.id} timed out, "
+                        "falling back to a direct request"
+                    )
+                    await self.client.messages.batches.cancel(message_batch.id)
+                    return None
+
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+                message_batch = await self.client.messages.batches.retrieve(message_batch.id)
+
+            async for entry in await self.client.messages.batches.results(message_batch.id):
+                if entry.custom_id != custom_id:
+                    continue
+                if entry.result.type == "succeeded":
+                    return entry.result.message
+                logger.warning(
+                    f"Message batch {message_batch.id} request {entry.result.type}, "
+                    "falling back to a direct request"
+                )
+                return None
 
-Educational Principles:
-- Start with "WHY" before "HOW" - motivation drives understanding
-- Use analogies only when they clarify, never when they obscure
-- Prefer concrete examples over abstract descriptions
-- Connect new concepts to prior knowledge explicitly
-- Highlight common misconceptions and pitfalls
-- Provide progressive disclosure: overview → details → nuances
+        except Exception as e:
+            logger.warning(f"Message batch failed, falling back to a direct request: {e}")
 
-Quality Standards:
-- Every insight must be grounded in the provided source material
-- Citations must be accurate and specific
-- Explanations must be self-contained (understandable without external references)
-- Practical takeaways must be immediately actionable
-- Tone should match the learner's level (avoid condescension or overwhelming jargon)"""
+        return None
 
-        if stricter:
-            base_prompt += """
+    def _build_system_prompt(self, stricter: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build system prompt blocks for Claude.
 
-STRICT MODE ACTIVATED:
-- Be extremely precise and accurate - no speculation beyond source material
-- Reduce creativity in explanations - stick closely to source content
-- Emphasize source fidelity above all else
-- If uncertain about any detail, omit rather than infer
-- Double-check all technical claims against source material"""
+        Args:
+            stricter: Use stricter guidelines for accuracy
 
-        return base_prompt
+        Returns:
+            System prompt content blocks
+        """
+        return list(_system_prompt_blocks(stricter))
 
     def _build_user_prompt(
         self,
@@ -171,6 +539,9 @@ STRICT MODE ACTIVATED:
         """
         Build user prompt with context and request.
 
+        Only per-call content goes here; the static task and output format
+        instructions live in the system prompt.
+
         Args:
             context_text: Formatted context from retrieved chunks
             learning_context: Learning context metadata
@@ -202,94 +573,42 @@ STRICT MODE ACTIVATED:
 
 {context_text}
 
-# Task
+# Request
 
 Generate **{num_insights}** personalized learning insights based on the content above and tailored to my learning context.
 
-For each insight, provide:
-
-1. **Title**: Concise, specific title (max 100 characters)
-2. **Relevance Reason**: Brief explanation of why this insight matters for my current learning (50-100 words)
-3. **Explanation**: Main educational content using first-principles approach (300-500 words)
-   - Start with fundamentals (the "why")
-   - Build up to implementation (the "how")
-   - Include concrete examples
-   - Connect to my learning goals
-   - Highlight key takeaways
-4. **Practical Takeaway**: One actionable item I can do immediately (50-100 words)
-   - Should be specific and concrete
-   - Should align with my skill level
-   - Should advance toward my learning goal
-5. **Source Attribution**: Full source details (title, author, URL, date)
-
-# Output Format
-
-Return a JSON object matching this exact schema:
-
-```json
-{{
-  "insights": [
-    {{
-      "title": "string (max 100 chars)",
-      "relevance_reason": "string (50-100 words)",
-      "explanation": "string (300-500 words, first-principles approach)",
-      "practical_takeaway": "string (50-100 words, actionable)",
-      "source": {{
-        "title": "string (exact source title)",
-        "author": "string",
-        "url": "string (full URL)",
-        "published_date": "YYYY-MM-DD"
-      }},
-      "metadata": {{
-        "confidence": 0.0-1.0,
-        "estimated_read_time": integer (minutes),
-        "difficulty_level": "beginner|intermediate|advanced",
-        "tags": ["array", "of", "relevant", "tags"]
-      }}
-    }}
-  ]
-}}
-```
-
 IMPORTANT:
-- Return ONLY valid JSON, no additional text
-- Ensure all {num_insights} insights are unique and cover different aspects
-- Base all content strictly on the provided sources
 - Match explanation depth to my {difficulty} level
 - Make practical takeaways specific to my goal: "{goal}"
 """
 
         return prompt
 
-    def _build_context_text(self, chunks: List[Dict[str, Any]]) -> str:
+    def _build_context_text(self, numbered_chunks: List[Tuple[int, Dict[str, Any]]]) -> str:
         """
         Format retrieved chunks into context text.
 
         Args:
-            chunks: Retrieved chunks with metadata
+            numbered_chunks: (source number, chunk) pairs, numbered by overall
+                retrieval rank so sources are labelled the same in every shard
 
         Returns:
             Formatted context string
         """
-        context_parts = []
-
-        for i, chunk in enumerate(chunks, 1):
-            # Format chunk as numbered source
-            source_block = f"""## Source {i}: {chunk.get('content_title', 'Untitled')}
-
-**Author**: {chunk.get('content_author', 'Unknown')}
-**URL**: {chunk.get('content_url', 'N/A')}
-**Published**: {chunk.get('published_at', 'N/A')}
-**Relevance Score**: {chunk.get('similarity', 0):.3f}
-
-### Content:
-{chunk.get('chunk_text', '')}
-
----
-"""
-            context_parts.append(source_block)
-
-        return "\n".join(context_parts)
+        return "\n".join(
+            [
+                _SOURCE_TEMPLATE.format(
+                    i=i,
+                    title=chunk.get("content_title", "Untitled"),
+                    author=chunk.get("content_author", "Unknown"),
+                    url=chunk.get("content_url", "N/A"),
+                    published=chunk.get("published_at", "N/A"),
+                    similarity=chunk.get("similarity", 0),
+                    text=chunk.get("chunk_text", ""),
+                )
+                for i, chunk in numbered_chunks
+            ]
+        )
 
     def _extract_json(self, response_text: str) -> Dict[str, Any]:
         """
@@ -301,28 +620,27 @@ IMPORTANT:
         Returns:
             Parsed JSON dictionary
         """
-        # Try direct JSON parse first
-        try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            pass
+        # Try direct JSON parse first (only worth it for a bare object)
+        if response_text.lstrip().startswith("{"):
+            try:
+                return orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                pass
 
         # Try extracting from markdown code block
-        import re
-
-        json_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", response_text, re.DOTALL)
+        json_match = _JSON_FENCE_RE.search(response_text)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
+                return orjson.loads(json_match.group(1))
+            except orjson.JSONDecodeError:
                 pass
 
         # Try finding raw JSON object
-        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if json_match:
+        json_span = _find_json_span(response_text)
+        if json_span:
             try:
-                return json.loads(json_match.group(0))
-            except json.JSONDecodeError:
+                return orjson.loads(json_span)
+            except orjson.JSONDecodeError:
                 pass
 
         logger.error(f"Could not extract JSON from response: {response_text[:500]}")
@@ -332,6 +650,7 @@ IMPORTANT:
         self,
         insights_data: Dict[str, Any],
         retrieved_chunks: List[Dict[str, Any]],
+        now: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Validate and enrich insights with additional metadata.
@@ -339,6 +658,7 @@ IMPORTANT:
         Args:
             insights_data: Parsed insights from Claude
             retrieved_chunks: Original chunks for reference
+            now: Generation time (default: current time)
 
         Returns:
             Validated and enriched insights list
@@ -347,9 +667,16 @@ IMPORTANT:
 
         enriched = []
 
+        now = now or datetime.now()
+        timestamp = now.timestamp()
+        generated_at = now.isoformat()
+
+        # Every insight references the same top 3 chunks; one list shared by all
+        top_chunk_ids = [chunk["id"] for chunk in retrieved_chunks[:3]]
+
         for i, insight in enumerate(insights):
             # Generate unique ID
-            insight["id"] = f"insight_{datetime.now().timestamp()}_{i}"
+            insight["id"] = f"insight_{timestamp}_{i}"
 
             # Ensure all required fields exist
             if not all(
@@ -360,16 +687,14 @@ IMPORTANT:
                 continue
 
             # Add generation timestamp
-            insight["generated_at"] = datetime.now().isoformat()
+            insight["generated_at"] = generated_at
 
             # Ensure metadata exists
             if "metadata" not in insight:
                 insight["metadata"] = {}
 
             # Add chunk references
-            insight["metadata"]["source_chunks"] = [
-                chunk["id"] for chunk in retrieved_chunks[:3]
-            ]  # Top 3 chunks
+            insight["metadata"]["source_chunks"] = top_chunk_ids
 
             enriched.append(insight)
 
@@ -7,12 +7,24 @@ Provides tools and UI resources for personalized learning.
 
 import os
 import logging
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import httpx
+import orjson
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
 from fastmcp import FastMCP
 
+from .integrations.bootcamp import BootcampIntegration
+from .rag.digest_generator import DigestGenerator
+from .rag.insight_search import InsightSearch
+from .tools.feedback_handler import FeedbackHandler
+from .tools.source_manager import SourceManager
+from .ui.daily_digest import render_daily_digest_ui
+from .utils.db import get_supabase_client
+
 # Load environment variables
 load_dotenv()
 
@@ -23,8 +35,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _serialize_tool_result(data: Any) -> str:
+    """Serialize tool results with orjson (datetimes, NumPy scalars; str() fallback)."""
+    return orjson.dumps(
+        data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
 # Initialize FastMCP server
-mcp = FastMCP("learning-coach")
+mcp = FastMCP("learning-coach", tool_serializer=_serialize_tool_result)
 
 # Configuration from environment
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -33,6 +53,93 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID", "00000000-0000-0000-0000-000000000001")
 
+# Accepted range for generate_daily_digest's max_insights
+MIN_DIGEST_INSIGHTS = 3
+MAX_DIGEST_INSIGHTS = 10
+
+
+# ============================================================================
+# SHARED COMPONENTS
+# ============================================================================
+
+# Created on first use and reused by every tool call, so HTTP connection pools
+# (Supabase, OpenAI, Anthropic) stay warm across calls
+_digest_generator = None
+_source_manager = None
+_feedback_handler = None
+_bootcamp_integration = None
+_insight_search = None
+_anthropic_client = None
+
+# Claude calls are long-running generations; connecting should still fail fast
+ANTHROPIC_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+ANTHROPIC_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+
+
+def _get_anthropic_client():
+    """Return the shared AsyncAnthropic client (None without an API key)."""
+    global _anthropic_client
+    if _anthropic_client is None and ANTHROPIC_API_KEY:
+        _anthropic_client = AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            max_retries=2,
+            timeout=ANTHROPIC_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=ANTHROPIC_LIMITS, timeout=ANTHROPIC_TIMEOUT),
+        )
+    return _anthropic_client
+
+
+def _get_digest_generator():
+    """Return the shared DigestGenerator."""
+    global _digest_generator
+    if _digest_generator is None:
+        _digest_generator = DigestGenerator(
+            supabase_url=SUPABASE_URL,
+            supabase_key=SUPABASE_KEY,
+            openai_api_key=OPENAI_API_KEY,
+            anthropic_api_key=ANTHROPIC_API_KEY,
+            anthropic_client=_get_anthropic_client(),
+        )
+    return _digest_generator
+
+
+def _get_source_manager():
+    """Return the shared SourceManager."""
+    global _source_manager
+    if _source_manager is None:
+        _source_manager = SourceManager(supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY)
+    return _source_manager
+
+
+def _get_feedback_handler():
+    """Return the shared FeedbackHandler."""
+    global _feedback_handler
+    if _feedback_handler is None:
+        _feedback_handler = FeedbackHandler(supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY)
+    return _feedback_handler
+
+
+def _get_bootcamp_integration():
+    """Return the shared BootcampIntegration."""
+    global _bootcamp_integration
+    if _bootcamp_integration is None:
+        _bootcamp_integration = BootcampIntegration(
+            supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY
+        )
+    return _bootcamp_integration
+
+
+def _get_insight_search():
+    """Return the shared InsightSearch."""
+    global _insight_search
+    if _insight_search is None:
+        _insight_search = InsightSearch(
+            supabase_url=SUPABASE_URL,
+            supabase_key=SUPABASE_KEY,
+            openai_api_key=OPENAI_API_KEY,
+        )
+    return _insight_search
+
 
 # ============================================================================
 # MCP TOOLS
@@ -44,6 +151,7 @@ async def generate_daily_digest(
     date: str = "today",
     max_insights: int = 7,
     force_refresh: bool = False,
+    batch: bool = False,
 ) -> Dict[str, Any]:
     """
     Generate personalized learning digest for specified date.
@@ -52,6 +160,8 @@ async def generate_daily_digest(
         date: ISO date string or "today" (default: "today")
         max_insights: Number of insights to generate (3-10, default: 7)
         force_refresh: Skip cache and regenerate (default: False)
+        batch: Use the discounted Anthropic Message Batches API; for scheduled,
+            non-interactive runs that can wait (default: False)
 
     Returns:
         JSON with insights array, sources, and RAGAS scores
@@ -61,18 +171,39 @@ async def generate_daily_digest(
         >>> print(digest['quality_badge'])
         ✨
     """
+    return await _generate_digest(
+        date=date, max_insights=max_insights, force_refresh=force_refresh, batch=batch
+    )
+
+
+async def _generate_digest(
+    date: str = "today",
+    max_insights: int = 7,
+    force_refresh: bool = False,
+    batch: bool = False,
+) -> Dict[str, Any]:
+    """
+    Generate the digest behind generate_daily_digest and the daily digest UI.
+
+    @mcp.tool() wraps the tool function in a FunctionTool, so in-process
+    callers (the UI resource) go through this plain coroutine instead.
+
+    Args:
+        date: ISO date string or "today"
+        max_insights: Number of insights to generate (clamped to 3-10)
+        force_refresh: Skip cache and regenerate
+        batch: Use the Anthropic Message Batches API
+
+    Returns:
+        Digest dictionary, or an error dictionary on failure
+    """
+    # Clamp before any expensive work so bad input can't request oversized generations
+    max_insights = max(MIN_DIGEST_INSIGHTS, min(MAX_DIGEST_INSIGHTS, int(max_insights)))
+
     logger.info(f"Generating daily digest: date={date}, max_insights={max_insights}")
 
     try:
-        # Import here to avoid circular dependencies
-        from .rag.digest_generator import DigestGenerator
-
-        generator = DigestGenerator(
-            supabase_url=SUPABASE_URL,
-            supabase_key=SUPABASE_KEY,
-            openai_api_key=OPENAI_API_KEY,
-            anthropic_api_key=ANTHROPIC_API_KEY,
-        )
+        generator = _get_digest_generator()
 
         # Parse date
         if date == "today":
@@ -86,6 +217,7 @@ async def generate_daily_digest(
             date=digest_date,
             max_insights=max_insights,
             force_refresh=force_refresh,
+            batch=batch,
         )
 
         logger.info(
@@ -130,9 +262,7 @@ async def manage_sources(
     logger.info(f"Managing sources: action={action}, type={source_type}")
 
     try:
-        from .tools.source_manager import SourceManager
-
-        manager = SourceManager(supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY)
+        manager = _get_source_manager()
 
         if action == "add":
             if not source_type or not source_identifier:
@@ -204,9 +334,7 @@ async def provide_feedback(
     logger.info(f"Recording feedback: insight_id={insight_id}, type={feedback_type}")
 
     try:
-        from .tools.feedback_handler import FeedbackHandler
-
-        handler = FeedbackHandler(supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY)
+        handler = _get_feedback_handler()
 
         await handler.record_feedback(
             user_id=DEFAULT_USER_ID,
@@ -241,12 +369,15 @@ async def sync_bootcamp_progress() -> str:
     logger.info("Syncing bootcamp progress")
 
     try:
-        from .integrations.bootcamp import BootcampIntegration
-
-        integration = BootcampIntegration(supabase_url=SUPABASE_URL, supabase_key=SUPABASE_KEY)
+        integration = _get_bootcamp_integration()
 
         progress = await integration.sync_progress(user_id=DEFAULT_USER_ID)
 
+        # The shared generator's QueryBuilder caches learning context; drop it
+        # so the next digest sees the synced week and topics
+        if _digest_generator is not None:
+            _digest_generator.query_builder.invalidate_learning_context(DEFAULT_USER_ID)
+
         return (
             f"✓ Synced: Week {progress['current_week']}, "
             f"Topics: {', '.join(progress['current_topics'])}"
@@ -283,13 +414,7 @@ async def search_past_insights(
     logger.info(f"Searching past insights: query='{query}'")
 
     try:
-        from .rag.insight_search import InsightSearch
-
-        search = InsightSearch(
-            supabase_url=SUPABASE_URL,
-            supabase_key=SUPABASE_KEY,
-            openai_api_key=OPENAI_API_KEY,
-        )
+        search = _get_insight_search()
 
         results = await search.search(
             user_id=DEFAULT_USER_ID,
@@ -311,18 +436,34 @@ async def search_past_insights(
 # ============================================================================
 
 
+# How long a rendered daily digest page is served before re-rendering
+UI_CACHE_TTL_SECONDS = 900
+
+# ISO date -> (rendered_at, html); only today's entry is ever kept
+_ui_cache: Dict[str, Tuple[float, str]] = {}
+
+
 @mcp.resource("ui://learning-coach/daily-digest")
 async def daily_digest_ui() -> str:
     """
     Interactive daily digest UI (HTML).
     Rendered in Claude.ai via MCP Apps.
     """
-    from .ui.daily_digest import render_daily_digest_ui
+    today = datetime.now().date().isoformat()
+    cached = _ui_cache.get(today)
+    if cached and time.monotonic() - cached[0] < UI_CACHE_TTL_SECONDS:
+        return cached[1]
 
     # Get today's digest
-    digest = await generate_daily_digest(date="today")
+    digest = await _generate_digest(date="today")
+
+    html = render_daily_digest_ui(digest)
+    # Don't pin an error page for the whole TTL
+    if "error" not in digest:
+        _ui_cache.clear()
+        _ui_cache[today] = (time.monotonic(), html)
 
-    return render_daily_digest_ui(digest)
+    return html
 
 
 # ============================================================================
@@ -356,6 +497,13 @@ def main():
         logger.info("Anthropic API key configured")
 
     logger.info("Configuration validated")
+
+    # Build the shared Supabase client now rather than on the first tool call
+    try:
+        get_supabase_client(SUPABASE_URL, SUPABASE_KEY)
+    except Exception as e:
+        logger.warning(f"Could not pre-create Supabase client: {e}")
+
     logger.info("Server name: learning-coach")
     logger.info(f"Default user ID: {DEFAULT_USER_ID}")
 
@@ -4,8 +4,12 @@ Feedback Handler
 Processes user feedback on insights and updates source priorities.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from supabase import Client
 
@@ -13,6 +17,28 @@ from ..utils.db import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Feedback types allowed by the feedback table's CHECK constraint
+_FEEDBACK_TYPES = ("helpful", "not_relevant", "incorrect", "too_basic", "too_advanced")
+_VALID_FEEDBACK_TYPES = frozenset(_FEEDBACK_TYPES)
+_INVALID_FEEDBACK_TYPE_ERROR = (
+    f"Invalid feedback type. Must be one of: {', '.join(_FEEDBACK_TYPES)}"
+)
+
+# How long a get_feedback_stats result is reused for the same user and period
+STATS_CACHE_TTL_SECONDS = 30
+
+# Source priority adjustment per feedback type (types not listed: no change)
+_PRIORITY_ADJUSTMENT = {
+    "helpful": 0.2,  # Increase priority
+    "not_relevant": -0.2,  # Decrease priority
+    "incorrect": -0.2,
+    "too_basic": -0.1,  # Slight decrease
+    "too_advanced": -0.1,
+}
+
+# Rows per bulk insert, to stay well under PostgREST request size limits
+INSERT_BATCH_SIZE = 500
+
 
 class FeedbackHandler:
     """Handles user feedback processing."""
@@ -26,6 +52,8 @@ class FeedbackHandler:
             supabase_key: Supabase API key
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
+        # (user_id, days) -> (computed_at, stats); dropped when the user records feedback
+        self._stats_cache: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
 
     async def record_feedback(
         self,
@@ -50,35 +78,24 @@ class FeedbackHandler:
         """
         logger.info(f"Recording feedback: type={feedback_type}, insight={insight_id}")
 
-        # Validate feedback type
-        valid_types = ["helpful", "not_relevant", "incorrect", "too_basic", "too_advanced"]
-        if feedback_type not in valid_types:
-            return {
-                "success": False,
-                "error": f"Invalid feedback type. Must be one of: {', '.join(valid_types)}",
-            }
-
-        # Truncate reason if too long
-        if reason and len(reason) > 500:
-            reason = reason[:500]
+        error = self._check_feedback_type(feedback_type)
+        if error:
+            return {"success": False, "error": error}
 
         try:
             # Insert feedback
-            result = (
+            result = await asyncio.to_thread(
                 self.db.table("feedback")
                 .insert(
-                    {
-                        "user_id": user_id,
-                        "insight_id": insight_id,
-                        "content_id": content_id,
-                        "type": feedback_type,
-                        "reason": reason,
-                        "created_at": datetime.now().isoformat(),
-                    }
+                    self._build_feedback_row(
+                        user_id, insight_id, feedback_type, reason, content_id
+                    ),
+                    returning="representation",
                 )
-                .execute()
+                .execute
             )
 
+            self._invalidate_stats(user_id)
             logger.info(f"✓ Feedback recorded: {feedback_type}")
 
             return {
@@ -91,6 +108,108 @@ class FeedbackHandler:
             logger.error(f"Error recording feedback: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    async def record_feedbacks(
+        self,
+        user_id: str,
+        items: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Record several feedback entries with bulk inserts.
+
+        Rows are inserted INSERT_BATCH_SIZE at a time.
+
+        Args:
+            user_id: User ID
+            items: Dicts with insight_id, feedback_type and optional reason/content_id
+
+        Returns:
+            One record_feedback-style result dictionary per item, in input order
+        """
+        logger.info(f"Recording {len(items)} feedback entries")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        rows = []
+        row_indices = []
+        for i, item in enumerate(items):
+            error = self._check_feedback_type(item["feedback_type"])
+            if error:
+                results[i] = {"success": False, "error": error}
+                continue
+            rows.append(
+                self._build_feedback_row(
+                    user_id,
+                    item["insight_id"],
+                    item["feedback_type"],
+                    item.get("reason"),
+                    item.get("content_id"),
+                )
+            )
+            row_indices.append(i)
+
+        # Insert feedback; with return=representation PostgREST returns the
+        # inserted rows (with IDs) in input order, so results map back by index
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch_indices = row_indices[start : start + INSERT_BATCH_SIZE]
+            try:
+                result = await asyncio.to_thread(
+                    self.db.table("feedback")
+                    .insert(rows[start : start + INSERT_BATCH_SIZE], returning="representation")
+                    .execute
+                )
+                for i, row in zip(batch_indices, result.data):
+                    results[i] = {
+                        "success": True,
+                        "message": "Feedback recorded",
+                        "feedback_id": row["id"],
+                    }
+            except Exception as e:
+                logger.error(f"Error recording feedback: {e}", exc_info=True)
+                for i in batch_indices:
+                    results[i] = {"success": False, "error": str(e)}
+
+        if row_indices:
+            self._invalidate_stats(user_id)
+
+        return results
+
+    def _invalidate_stats(self, user_id: str) -> None:
+        """Drop cached get_feedback_stats results for a user."""
+        for key in [key for key in self._stats_cache if key[0] == user_id]:
+            del self._stats_cache[key]
+
+    def _check_feedback_type(self, feedback_type: str) -> Optional[str]:
+        """
+        Check a feedback type.
+
+        Args:
+            feedback_type: Type of feedback
+
+        Returns:
+            Error message, or None if the type is valid
+        """
+        if feedback_type not in _VALID_FEEDBACK_TYPES:
+            return _INVALID_FEEDBACK_TYPE_ERROR
+        return None
+
+    def _build_feedback_row(
+        self,
+        user_id: str,
+        insight_id: str,
+        feedback_type: str,
+        reason: Optional[str],
+        content_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """Build the feedback row inserted for a validated entry."""
+        return {
+            "user_id": user_id,
+            "insight_id": insight_id,
+            "content_id": content_id,
+            "type": feedback_type,
+            "reason": reason and reason[:500],  # Truncate if too long
+            # created_at is filled in by the column default (NOW())
+        }
+
     async def update_source_priorities(
         self,
         insight_id: str,
@@ -107,13 +226,8 @@ class FeedbackHandler:
 
         try:
             # Determine priority adjustment
-            if feedback_type == "helpful":
-                adjustment = 0.2  # Increase priority
-            elif feedback_type in ["not_relevant", "incorrect"]:
-                adjustment = -0.2  # Decrease priority
-            elif feedback_type in ["too_basic", "too_advanced"]:
-                adjustment = -0.1  # Slight decrease
-            else:
+            adjustment = _PRIORITY_ADJUSTMENT.get(feedback_type)
+            if adjustment is None:
                 return  # No adjustment for other types
 
             # Find content IDs associated with this insight
@@ -145,53 +259,86 @@ class FeedbackHandler:
         Returns:
             Statistics dictionary
         """
+        key = (user_id, days)
+        cached = self._stats_cache.get(key)
+        if cached and time.monotonic() - cached[0] < STATS_CACHE_TTL_SECONDS:
+            return cached[1]
+
         try:
             # Get feedback from last N days
             from datetime import timedelta
 
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
 
-            result = (
-                self.db.table("feedback")
-                .select("*")
-                .eq("user_id", user_id)
-                .gte("created_at", cutoff_date)
-                .execute()
-            )
+            # Count by type
+            breakdown = await self._fetch_feedback_breakdown(user_id, cutoff_date)
+            if breakdown is None:
+                result = await asyncio.to_thread(
+                    self.db.table("feedback")
+                    .select("type")
+                    .eq("user_id", user_id)
+                    .gte("created_at", cutoff_date)
+                    .execute
+                )
 
-            feedbacks = result.data if result.data else []
+                feedbacks = result.data if result.data else []
+
+                breakdown = dict(Counter(map(itemgetter("type"), feedbacks)))
 
             # Calculate statistics
-            total = len(feedbacks)
+            total = sum(breakdown.values())
             if total == 0:
-                return {
+                stats = {
                     "total": 0,
                     "helpful_rate": 0.0,
                     "breakdown": {},
                 }
+            else:
+                # Calculate helpful rate
+                helpful_rate = breakdown.get("helpful", 0) / total
+
+                stats = {
+                    "total": total,
+                    "helpful_rate": helpful_rate,
+                    "helpful_percentage": helpful_rate * 100,
+                    "breakdown": breakdown,
+                    "period_days": days,
+                }
 
-            # Count by type
-            breakdown = {}
-            for feedback in feedbacks:
-                ftype = feedback["type"]
-                breakdown[ftype] = breakdown.get(ftype, 0) + 1
-
-            # Calculate helpful rate
-            helpful_count = breakdown.get("helpful", 0)
-            helpful_rate = helpful_count / total if total > 0 else 0
-
-            return {
-                "total": total,
-                "helpful_rate": helpful_rate,
-                "helpful_percentage": helpful_rate * 100,
-                "breakdown": breakdown,
-                "period_days": days,
-            }
+            self._stats_cache[key] = (time.monotonic(), stats)
+            return stats
 
         except Exception as e:
             logger.error(f"Error getting feedback stats: {e}", exc_info=True)
             return {"error": str(e)}
 
+    async def _fetch_feedback_breakdown(
+        self,
+        user_id: str,
+        cutoff_date: str,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Count a user's feedback by type in the database (feedback_breakdown RPC).
+
+        Args:
+            user_id: User ID
+            cutoff_date: ISO timestamp; only feedback created at or after it counts
+
+        Returns:
+            Mapping of feedback type to count, or None if the RPC failed
+        """
+        try:
+            result = await asyncio.to_thread(
+                self.db.rpc(
+                    "feedback_breakdown", {"p_user": user_id, "p_since": cutoff_date}
+                ).execute
+            )
+        except Exception as e:
+            logger.warning(f"feedback_breakdown RPC failed, counting rows: {e}")
+            return None
+
+        return {row["type"]: row["n"] for row in result.data or []}
+
     async def get_source_feedback_scores(self, user_id: str) -> Dict[str, float]:
         """
         Get feedback-based scores for each source.
@@ -203,37 +350,37 @@ class FeedbackHandler:
             Dictionary mapping source_id to feedback score
         """
         try:
-            # Get all feedback with content associations
-            result = (
+            result = await asyncio.to_thread(
+                self.db.rpc("source_feedback_scores", {"p_user": user_id}).execute
+            )
+            return {row["source_id"]: row["score"] for row in result.data or []}
+        except Exception as e:
+            logger.warning(f"source_feedback_scores RPC failed, scoring rows: {e}")
+
+        try:
+            # Get all feedback with its content's source_id, joined server-side
+            # through the feedback.content_id foreign key (one round trip)
+            result = await asyncio.to_thread(
                 self.db.table("feedback")
-                .select("type, content_id")
+                .select("type, content(source_id)")
                 .eq("user_id", user_id)
                 .not_.is_("content_id", "null")
-                .execute()
+                .execute
             )
 
             feedbacks = result.data if result.data else []
 
-            # Map content_id to source_id and calculate scores
+            # Calculate scores per source
             source_scores = {}
 
             for feedback in feedbacks:
-                content_id = feedback["content_id"]
                 ftype = feedback["type"]
 
-                # Get source_id for this content
-                content_result = (
-                    self.db.table("content")
-                    .select("source_id")
-                    .eq("id", content_id)
-                    .single()
-                    .execute()
-                )
-
-                if not content_result.data:
+                content = feedback.get("content")
+                if not content:
                     continue
 
-                source_id = content_result.data["source_id"]
+                source_id = content["source_id"]
 
                 # Update score
                 if source_id not in source_scores:
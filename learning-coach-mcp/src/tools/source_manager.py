@@ -5,17 +5,41 @@ Manages content sources (RSS feeds, Twitter, Reddit, etc.)
 Provides CRUD operations for sources.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
 from supabase import Client
 import httpx
-import feedparser
 
 from ..utils.db import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Source validation requests share one pooled HTTP client
+VALIDATION_TIMEOUT_SECONDS = 10.0
+VALIDATION_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# Feed validation reads at most FEED_MAX_BYTES and stops at the first entry
+# element (RSS item or Atom entry, namespace stripped)
+FEED_MAX_BYTES = 256 * 1024
+FEED_ENTRY_TAGS = frozenset(("item", "entry"))
+FEED_REQUEST_HEADERS = {
+    "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8"
+}
+
+# Source types allowed by the sources table's CHECK constraint
+_SOURCE_TYPES = ("rss", "twitter", "reddit", "custom_url", "youtube")
+_VALID_SOURCE_TYPES = frozenset(_SOURCE_TYPES)
+_INVALID_SOURCE_TYPE_ERROR = f"Invalid source type. Must be one of: {', '.join(_SOURCE_TYPES)}"
+
+# How long a list_sources result is reused for the same user
+LIST_CACHE_TTL_SECONDS = 30
+
+# Rows per bulk insert, to stay well under PostgREST request size limits
+INSERT_BATCH_SIZE = 500
+
 
 class SourceManager:
     """Manages content sources for users."""
@@ -29,6 +53,20 @@ class SourceManager:
             supabase_key: Supabase API key
         """
         self.db = get_supabase_client(supabase_url, supabase_key)
+        # Created on first validation; needs a running event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        # user_id -> (listed_at, list_sources result); dropped on any source change
+        self._list_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client used for source validation."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=VALIDATION_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                limits=VALIDATION_LIMITS,
+            )
+        return self._http
 
     async def add_source(
         self,
@@ -51,17 +89,9 @@ class SourceManager:
         """
         logger.info(f"Adding source: type={source_type}, identifier={identifier}")
 
-        # Validate source type
-        valid_types = ["rss", "twitter", "reddit", "custom_url", "youtube"]
-        if source_type not in valid_types:
-            return {
-                "success": False,
-                "error": f"Invalid source type. Must be one of: {', '.join(valid_types)}",
-            }
-
-        # Validate priority
-        if not 1 <= priority <= 5:
-            return {"success": False, "error": "Priority must be between 1 and 5"}
+        error = self._check_source_params(source_type, priority)
+        if error:
+            return {"success": False, "error": error}
 
         # Validate source is reachable
         is_valid = await self._validate_source(source_type, identifier)
@@ -71,58 +101,231 @@ class SourceManager:
                 "error": f"Source validation failed. Could not reach: {identifier}",
             }
 
-        # Check for duplicates
-        existing = (
-            self.db.table("sources")
-            .select("id")
-            .eq("user_id", user_id)
-            .eq("identifier", identifier)
-            .execute()
-        )
-
-        if existing.data:
-            return {
-                "success": False,
-                "error": f"Source already exists: {identifier}",
-                "source_id": existing.data[0]["id"],
-            }
-
-        # Insert source
+        # Insert source; an existing (user_id, identifier) row is left alone by
+        # the unique constraint and nothing is returned
         try:
-            result = (
+            result = await asyncio.to_thread(
                 self.db.table("sources")
-                .insert(
-                    {
-                        "user_id": user_id,
-                        "type": source_type,
-                        "identifier": identifier,
-                        "priority": priority,
-                        "active": True,
-                        "health_score": 1.0,
-                        "metadata": {
-                            "added_at": datetime.now().isoformat(),
-                            "validation_status": "valid",
-                        },
-                    }
+                .upsert(
+                    self._build_source_row(user_id, source_type, identifier, priority),
+                    on_conflict="user_id,identifier",
+                    ignore_duplicates=True,
+                    returning="representation",
                 )
-                .execute()
+                .execute
             )
 
+            self._list_cache.pop(user_id, None)
+
+            if not result.data:
+                existing_ids = await self._fetch_source_ids(user_id, [identifier])
+                return {
+                    "success": False,
+                    "error": f"Source already exists: {identifier}",
+                    "source_id": existing_ids.get(identifier),
+                }
+
             source_id = result.data[0]["id"]
 
             logger.info(f"✓ Source added successfully: {source_id}")
 
-            return {
-                "success": True,
-                "message": f"Added source: {identifier}",
-                "source_id": source_id,
-                "source": result.data[0],
-            }
+            return self._added_result(identifier, result.data[0])
 
         except Exception as e:
             logger.error(f"Error adding source: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    async def add_sources(
+        self,
+        user_id: str,
+        sources: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Add several content sources with bulk inserts.
+
+        Reachability checks run concurrently; rows are inserted
+        INSERT_BATCH_SIZE at a time.
+
+        Args:
+            user_id: User ID
+            sources: Dicts with source_type, identifier and optional priority
+
+        Returns:
+            One add_source-style result dictionary per source, in input order
+        """
+        logger.info(f"Adding {len(sources)} sources")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+
+        candidates = []
+        for i, source in enumerate(sources):
+            error = self._check_source_params(source["source_type"], source.get("priority", 3))
+            if error:
+                results[i] = {"success": False, "error": error}
+            else:
+                candidates.append(i)
+
+        # Validate sources are reachable
+        reachable = await asyncio.gather(
+            *(
+                self._validate_source(sources[i]["source_type"], sources[i]["identifier"])
+                for i in candidates
+            )
+        )
+        valid = []
+        for i, is_valid in zip(candidates, reachable):
+            if is_valid:
+                valid.append(i)
+            else:
+                identifier = sources[i]["identifier"]
+                results[i] = {
+                    "success": False,
+                    "error": f"Source validation failed. Could not reach: {identifier}",
+                }
+
+        rows = []
+        row_indices = []
+        batch_identifiers = set()
+        for i in valid:
+            identifier = sources[i]["identifier"]
+            if identifier in batch_identifiers:
+                results[i] = {
+                    "success": False,
+                    "error": f"Duplicate source in request: {identifier}",
+                }
+                continue
+            batch_identifiers.add(identifier)
+            rows.append(
+                self._build_source_row(
+                    user_id, sources[i]["source_type"], identifier, sources[i].get("priority", 3)
+                )
+            )
+            row_indices.append(i)
+
+        # Insert sources; with return=representation PostgREST returns the
+        # inserted rows (with IDs), but rows whose (user_id, identifier) already
+        # exists are skipped by the unique constraint, so match by identifier
+        inserted = {}
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            try:
+                result = await asyncio.to_thread(
+                    self.db.table("sources")
+                    .upsert(
+                        rows[start : start + INSERT_BATCH_SIZE],
+                        on_conflict="user_id,identifier",
+                        ignore_duplicates=True,
+                        returning="representation",
+                    )
+                    .execute
+                )
+                inserted.update((row["identifier"], row) for row in result.data or [])
+            except Exception as e:
+                logger.error(f"Error adding sources: {e}", exc_info=True)
+                for i in row_indices[start : start + INSERT_BATCH_SIZE]:
+                    results[i] = {"success": False, "error": str(e)}
+
+        if inserted:
+            self._list_cache.pop(user_id, None)
+
+        duplicates = []
+        for i in row_indices:
+            identifier = sources[i]["identifier"]
+            if identifier in inserted:
+                results[i] = self._added_result(identifier, inserted[identifier])
+            elif results[i] is None:
+                duplicates.append(i)
+
+        # Look up existing IDs only when something was a duplicate
+        if duplicates:
+            existing_ids = await self._fetch_source_ids(
+                user_id, [sources[i]["identifier"] for i in duplicates]
+            )
+            for i in duplicates:
+                identifier = sources[i]["identifier"]
+                results[i] = {
+                    "success": False,
+                    "error": f"Source already exists: {identifier}",
+                    "source_id": existing_ids.get(identifier),
+                }
+
+        logger.info(f"✓ Added {sum(1 for r in results if r['success'])}/{len(sources)} sources")
+
+        return results
+
+    async def _fetch_source_ids(self, user_id: str, identifiers: List[str]) -> Dict[str, str]:
+        """
+        Look up stored source IDs by identifier.
+
+        Args:
+            user_id: User ID
+            identifiers: Source identifiers
+
+        Returns:
+            Mapping of identifier to source ID (empty if the lookup failed)
+        """
+        try:
+            result = await asyncio.to_thread(
+                self.db.table("sources")
+                .select("id, identifier")
+                .eq("user_id", user_id)
+                .in_("identifier", identifiers)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"Could not look up existing sources: {e}")
+            return {}
+
+        return {row["identifier"]: row["id"] for row in result.data or []}
+
+    def _check_source_params(self, source_type: str, priority: int) -> Optional[str]:
+        """
+        Check source type and priority.
+
+        Args:
+            source_type: Type of source
+            priority: Priority level
+
+        Returns:
+            Error message, or None if both are valid
+        """
+        # Validate source type
+        if source_type not in _VALID_SOURCE_TYPES:
+            return _INVALID_SOURCE_TYPE_ERROR
+
+        # Validate priority
+        if not 1 <= priority <= 5:
+            return "Priority must be between 1 and 5"
+
+        return None
+
+    def _build_source_row(
+        self,
+        user_id: str,
+        source_type: str,
+        identifier: str,
+        priority: int,
+    ) -> Dict[str, Any]:
+        """Build the sources row inserted for a new, validated source."""
+        return {
+            "user_id": user_id,
+            "type": source_type,
+            "identifier": identifier,
+            "priority": priority,
+            "active": True,
+            "health_score": 1.0,
+            # created_at (when the source was added) comes from the column default
+            "metadata": {"validation_status": "valid"},
+        }
+
+    def _added_result(self, identifier: str, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the success result for an inserted source row."""
+        return {
+            "success": True,
+            "message": f"Added source: {identifier}",
+            "source_id": source["id"],
+            "source": source,
+        }
+
     async def remove_source(
         self,
         user_id: str,
@@ -141,22 +344,22 @@ class SourceManager:
         logger.info(f"Removing source: {identifier}")
 
         try:
-            # Find source
-            source_result = (
+            # Delete source (cascade will delete related content and embeddings);
+            # PostgREST returns the deleted row, so no lookup is needed first
+            result = await asyncio.to_thread(
                 self.db.table("sources")
-                .select("id")
+                .delete()
                 .eq("user_id", user_id)
                 .eq("identifier", identifier)
-                .execute()
+                .execute
             )
 
-            if not source_result.data:
-                return {"success": False, "error": f"Source not found: {identifier}"}
+            self._list_cache.pop(user_id, None)
 
-            source_id = source_result.data[0]["id"]
+            if not result.data:
+                return {"success": False, "error": f"Source not found: {identifier}"}
 
-            # Delete source (cascade will delete related content and embeddings)
-            self.db.table("sources").delete().eq("id", source_id).execute()
+            source_id = result.data[0]["id"]
 
             logger.info(f"✓ Source removed: {identifier}")
 
@@ -191,42 +394,34 @@ class SourceManager:
         """
         logger.info(f"Updating source: {identifier}")
 
+        # Build update data
+        update_data = {}
+        if priority is not None:
+            if not 1 <= priority <= 5:
+                return {"success": False, "error": "Priority must be between 1 and 5"}
+            update_data["priority"] = priority
+
+        if active is not None:
+            update_data["active"] = active
+
+        if not update_data:
+            return {"success": False, "error": "No updates provided"}
+
         try:
-            # Find source
-            source_result = (
+            # Update source; PostgREST returns the updated row, so no lookup
+            # is needed first
+            result = await asyncio.to_thread(
                 self.db.table("sources")
-                .select("*")
+                .update(update_data)
                 .eq("user_id", user_id)
                 .eq("identifier", identifier)
-                .single()
-                .execute()
+                .execute
             )
 
-            if not source_result.data:
-                return {"success": False, "error": f"Source not found: {identifier}"}
-
-            source_id = source_result.data["id"]
-
-            # Build update data
-            update_data = {}
-            if priority is not None:
-                if not 1 <= priority <= 5:
-                    return {"success": False, "error": "Priority must be between 1 and 5"}
-                update_data["priority"] = priority
-
-            if active is not None:
-                update_data["active"] = active
-
-            if not update_data:
-                return {"success": False, "error": "No updates provided"}
+            self._list_cache.pop(user_id, None)
 
-            # Update source
-            result = (
-                self.db.table("sources")
-                .update(update_data)
-                .eq("id", source_id)
-                .execute()
-            )
+            if not result.data:
+                return {"success": False, "error": f"Source not found: {identifier}"}
 
             logger.info(f"✓ Source updated: {identifier}")
 
@@ -250,41 +445,74 @@ class SourceManager:
         Returns:
             Dictionary with sources list
         """
+        cached = self._list_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < LIST_CACHE_TTL_SECONDS:
+            return cached[1]
+
         try:
-            result = (
+            # Listing columns only; metadata and user_id aren't returned
+            result = await asyncio.to_thread(
                 self.db.table("sources")
-                .select("*")
+                .select(
+                    "id, type, identifier, priority, active, health_score, "
+                    "last_fetched, created_at"
+                )
                 .eq("user_id", user_id)
                 .order("priority", desc=True)
-                .execute()
+                .execute
             )
 
             sources = result.data if result.data else []
 
             # Add statistics for each source
+            counts = await self._fetch_content_counts(user_id) if sources else {}
             for source in sources:
-                # Count content from this source
-                content_count = (
-                    self.db.table("content")
-                    .select("id", count="exact")
-                    .eq("source_id", source["id"])
-                    .execute()
-                )
-
-                source["content_count"] = content_count.count if content_count else 0
+                if counts is None:
+                    # Count content from this source
+                    content_count = await asyncio.to_thread(
+                        self.db.table("content")
+                        .select("id", count="exact")
+                        .eq("source_id", source["id"])
+                        .execute
+                    )
+                    source["content_count"] = content_count.count if content_count else 0
+                else:
+                    source["content_count"] = counts.get(source["id"], 0)
 
             logger.info(f"Listed {len(sources)} sources for user {user_id}")
 
-            return {
+            listing = {
                 "success": True,
                 "sources": sources,
                 "total": len(sources),
             }
+            self._list_cache[user_id] = (time.monotonic(), listing)
+            return listing
 
         except Exception as e:
             logger.error(f"Error listing sources: {e}", exc_info=True)
             return {"success": False, "error": str(e), "sources": []}
 
+    async def _fetch_content_counts(self, user_id: str) -> Optional[Dict[str, int]]:
+        """
+        Count content per source in the database (source_content_counts RPC).
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Mapping of source_id to content count, or None if the RPC failed
+        """
+        try:
+            result = await asyncio.to_thread(
+                self.db.rpc("source_content_counts", {"p_user": user_id}).execute
+            )
+        except Exception as e:
+            logger.warning(f"source_content_counts RPC failed, counting per source: {e}")
+            return None
+
+        return {row["source_id"]: row["n"] for row in result.data or []}
+
     async def _validate_source(self, source_type: str, identifier: str) -> bool:
         """
         Validate that a source is reachable and valid.
@@ -315,19 +543,50 @@ class SourceManager:
     async def _validate_rss(self, url: str) -> bool:
         """Validate RSS feed."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0, follow_redirects=True)
+            parser = XMLPullParser(events=("start",))
+            well_formed = True
+            truncated = False
+            body = bytearray()
+
+            async with self._get_http_client().stream(
+                "GET", url, headers=FEED_REQUEST_HEADERS
+            ) as response:
                 response.raise_for_status()
 
-                # Try to parse as RSS
-                feed = feedparser.parse(response.text)
-
-                # Check if valid feed
-                if feed.bozo and not feed.entries:
+                # Well-formed feeds are decided by a streaming parse that stops
+                # at the first entry, so most of a large feed is never downloaded
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if well_formed:
+                        try:
+                            if _has_feed_entry(parser, chunk):
+                                return True
+                        except ParseError:
+                            well_formed = False
+                    if len(body) >= FEED_MAX_BYTES:
+                        truncated = True
+                        break
+
+            if well_formed and not truncated:
+                try:
+                    parser.close()
                     logger.warning(f"Invalid RSS feed: {url}")
                     return False
+                except ParseError:
+                    pass
+
+            # Anything else goes through feedparser's lenient parser. Imported
+            # here: it is slow to import and most feeds never need it
+            import feedparser
+
+            feed = feedparser.parse(bytes(body))
 
-                return len(feed.entries) > 0
+            # Check if valid feed
+            if feed.bozo and not feed.entries:
+                logger.warning(f"Invalid RSS feed: {url}")
+                return False
+
+            return len(feed.entries) > 0
 
         except Exception as e:
             logger.warning(f"RSS validation failed for {url}: {e}")
@@ -336,16 +595,35 @@ class SourceManager:
     async def _validate_url(self, url: str) -> bool:
         """Validate custom URL."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0, follow_redirects=True)
-                response.raise_for_status()
-                return True
+            response = await self._get_http_client().get(url)
+            response.raise_for_status()
+            return True
 
         except Exception as e:
             logger.warning(f"URL validation failed for {url}: {e}")
             return False
 
 
+def _has_feed_entry(parser: XMLPullParser, data: bytes) -> bool:
+    """
+    Feed the next piece of a document to an incremental XML parser.
+
+    Args:
+        parser: Parser for the document, created with events=("start",)
+        data: Next bytes of the document
+
+    Returns:
+        True once an <item>/<entry> start tag has been parsed
+
+    Raises:
+        ParseError: If the document is not well-formed XML
+    """
+    parser.feed(data)
+    return any(
+        element.tag.rpartition("}")[2] in FEED_ENTRY_TAGS for _, element in parser.read_events()
+    )
+
+
 async def test_source_manager(
     supabase_url: str,
     supabase_key: str,
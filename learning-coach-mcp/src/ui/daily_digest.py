@@ -4,43 +4,21 @@ Daily Digest Interactive UI
 Renders the daily digest as an interactive HTML interface for Claude.ai MCP Apps.
 """
 
+import html
 import logging
-from typing import Dict, Any
+import re
+from string import Template
+from typing import Dict, Any, Iterator
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
-
-
-def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
-    """
-    Render daily digest as interactive HTML.
-
-    Args:
-        digest: Digest dictionary with insights and metadata
+import orjson
 
-    Returns:
-        HTML string for MCP UI resource
-    """
-    logger.info("Rendering daily digest UI")
-
-    insights = digest.get("insights", [])
-    date = digest.get("date", datetime.now().date().isoformat())
-    quality_badge = digest.get("quality_badge", "✓")
-    ragas_scores = digest.get("ragas_scores", {})
-    metadata = digest.get("metadata", {})
+from .render_cache import RenderCache
 
-    # Build insights HTML
-    insights_html = _render_insights(insights)
+logger = logging.getLogger(__name__)
 
-    # Build HTML
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Learning Digest - {date}</title>
-    <style>
-        :root {{
+# Static stylesheet, emitted verbatim between the page head and body
+_DAILY_CSS = """        :root {
             --bg-primary: #0a0a0a;
             --bg-secondary: #1a1a1a;
             --bg-tertiary: #2a2a2a;
@@ -53,15 +31,15 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             --warning: #f59e0b;
             --danger: #ef4444;
             --border: #333333;
-        }}
+        }
 
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             background: var(--bg-primary);
             color: var(--text-primary);
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
@@ -69,31 +47,31 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             padding: 20px;
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
 
         /* Header */
-        .digest-header {{
+        .digest-header {
             border-bottom: 1px solid var(--border);
             padding-bottom: 20px;
             margin-bottom: 30px;
-        }}
+        }
 
-        .digest-title {{
+        .digest-title {
             font-size: 28px;
             font-weight: 700;
             margin-bottom: 8px;
-        }}
+        }
 
-        .digest-meta {{
+        .digest-meta {
             display: flex;
             gap: 20px;
             align-items: center;
             flex-wrap: wrap;
             color: var(--text-secondary);
             font-size: 14px;
-        }}
+        }
 
-        .quality-badge {{
+        .quality-badge {
             display: inline-flex;
             align-items: center;
             gap: 6px;
@@ -102,72 +80,72 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             background: var(--bg-secondary);
             font-size: 14px;
             font-weight: 500;
-        }}
+        }
 
-        .quality-badge.high {{ border: 1px solid var(--success); }}
-        .quality-badge.good {{ border: 1px solid var(--accent); }}
-        .quality-badge.warning {{ border: 1px solid var(--warning); }}
+        .quality-badge.high { border: 1px solid var(--success); }
+        .quality-badge.good { border: 1px solid var(--accent); }
+        .quality-badge.warning { border: 1px solid var(--warning); }
 
-        .ragas-scores {{
+        .ragas-scores {
             display: flex;
             gap: 15px;
             font-size: 13px;
-        }}
+        }
 
-        .ragas-score {{
+        .ragas-score {
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .ragas-label {{
+        .ragas-label {
             color: var(--text-muted);
             font-size: 11px;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .ragas-value {{
+        .ragas-value {
             color: var(--text-primary);
             font-weight: 600;
-        }}
+        }
 
         /* Insights */
-        .insights-container {{
+        .insights-container {
             display: flex;
             flex-direction: column;
             gap: 20px;
-        }}
+        }
 
-        .insight-card {{
+        .insight-card {
             background: var(--bg-secondary);
             border: 1px solid var(--border);
             border-radius: 12px;
             padding: 24px;
             transition: all 0.2s ease;
-        }}
+        }
 
-        .insight-card:hover {{
+        .insight-card:hover {
             transform: translateY(-2px);
             box-shadow: 0 8px 16px rgba(0, 0, 0, 0.4);
             border-color: var(--accent);
-        }}
+        }
 
-        .insight-header {{
+        .insight-header {
             display: flex;
             justify-content: space-between;
             align-items: start;
             margin-bottom: 16px;
-        }}
+        }
 
-        .insight-title {{
+        .insight-title {
             font-size: 20px;
             font-weight: 600;
             color: var(--accent);
             flex: 1;
             line-height: 1.3;
-        }}
+        }
 
-        .insight-number {{
+        .insight-number {
             display: inline-flex;
             align-items: center;
             justify-content: center;
@@ -180,43 +158,43 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             color: var(--text-secondary);
             flex-shrink: 0;
             margin-right: 12px;
-        }}
+        }
 
-        .relevance-section {{
+        .relevance-section {
             background: var(--bg-tertiary);
             padding: 12px 16px;
             border-radius: 8px;
             margin-bottom: 16px;
             border-left: 3px solid var(--accent);
-        }}
+        }
 
-        .relevance-label {{
+        .relevance-label {
             font-size: 12px;
             text-transform: uppercase;
             letter-spacing: 0.5px;
             color: var(--text-muted);
             margin-bottom: 4px;
-        }}
+        }
 
-        .relevance-text {{
+        .relevance-text {
             color: var(--text-secondary);
             font-size: 14px;
-        }}
+        }
 
-        .explanation {{
+        .explanation {
             color: var(--text-primary);
             margin: 16px 0;
             line-height: 1.8;
             font-size: 15px;
-        }}
+        }
 
-        .explanation.collapsed {{
+        .explanation.collapsed {
             max-height: 150px;
             overflow: hidden;
             position: relative;
-        }}
+        }
 
-        .explanation.collapsed::after {{
+        .explanation.collapsed::after {
             content: '';
             position: absolute;
             bottom: 0;
@@ -224,9 +202,9 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             right: 0;
             height: 60px;
             background: linear-gradient(transparent, var(--bg-secondary));
-        }}
+        }
 
-        .read-more {{
+        .read-more {
             color: var(--accent);
             cursor: pointer;
             font-size: 14px;
@@ -234,22 +212,22 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             margin-top: 8px;
             display: inline-block;
             text-decoration: none;
-        }}
+        }
 
-        .read-more:hover {{
+        .read-more:hover {
             color: var(--accent-hover);
             text-decoration: underline;
-        }}
+        }
 
-        .takeaway {{
+        .takeaway {
             background: var(--bg-primary);
             border-left: 3px solid var(--success);
             padding: 16px;
             margin: 16px 0;
             border-radius: 4px;
-        }}
+        }
 
-        .takeaway-label {{
+        .takeaway-label {
             font-weight: 600;
             color: var(--success);
             margin-bottom: 8px;
@@ -257,49 +235,49 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             align-items: center;
             gap: 6px;
             font-size: 14px;
-        }}
+        }
 
-        .takeaway-text {{
+        .takeaway-text {
             color: var(--text-secondary);
             font-size: 14px;
             line-height: 1.6;
-        }}
+        }
 
-        .source {{
+        .source {
             margin-top: 16px;
             padding-top: 16px;
             border-top: 1px solid var(--border);
             font-size: 13px;
             color: var(--text-muted);
-        }}
+        }
 
-        .source-title {{
+        .source-title {
             color: var(--text-secondary);
             font-weight: 500;
             margin-bottom: 4px;
-        }}
+        }
 
-        .source-link {{
+        .source-link {
             color: var(--accent);
             text-decoration: none;
             display: inline-flex;
             align-items: center;
             gap: 4px;
             margin-top: 4px;
-        }}
+        }
 
-        .source-link:hover {{
+        .source-link:hover {
             color: var(--accent-hover);
             text-decoration: underline;
-        }}
+        }
 
-        .feedback-buttons {{
+        .feedback-buttons {
             display: flex;
             gap: 12px;
             margin-top: 16px;
-        }}
+        }
 
-        .feedback-btn {{
+        .feedback-btn {
             background: var(--bg-tertiary);
             border: 1px solid var(--border);
             color: var(--text-primary);
@@ -312,211 +290,204 @@ def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
             display: inline-flex;
             align-items: center;
             gap: 6px;
-        }}
+        }
 
-        .feedback-btn:hover {{
+        .feedback-btn:hover {
             background: var(--bg-secondary);
             border-color: var(--accent);
             transform: translateY(-1px);
-        }}
+        }
 
-        .feedback-btn.active {{
+        .feedback-btn.active {
             background: var(--success);
             border-color: var(--success);
             color: white;
-        }}
+        }
 
-        .feedback-btn.active.negative {{
+        .feedback-btn.active.negative {
             background: var(--danger);
             border-color: var(--danger);
-        }}
+        }
 
         /* Empty state */
-        .empty-state {{
+        .empty-state {
             text-align: center;
             padding: 60px 20px;
             color: var(--text-secondary);
-        }}
+        }
 
-        .empty-state-icon {{
+        .empty-state-icon {
             font-size: 48px;
             margin-bottom: 16px;
             opacity: 0.5;
-        }}
+        }
 
-        .empty-state-title {{
+        .empty-state-title {
             font-size: 20px;
             font-weight: 600;
             margin-bottom: 8px;
             color: var(--text-primary);
-        }}
+        }
 
         /* Responsive */
-        @media (max-width: 768px) {{
-            body {{
+        @media (max-width: 768px) {
+            body {
                 padding: 12px;
-            }}
+            }
 
-            .digest-title {{
+            .digest-title {
                 font-size: 24px;
-            }}
+            }
 
-            .insight-card {{
+            .insight-card {
                 padding: 16px;
-            }}
+            }
 
-            .insight-title {{
+            .insight-title {
                 font-size: 18px;
-            }}
+            }
 
-            .feedback-buttons {{
+            .feedback-buttons {
                 flex-direction: column;
-            }}
+            }
 
-            .feedback-btn {{
+            .feedback-btn {
                 width: 100%;
                 justify-content: center;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# Page skeleton around the stylesheet, parsed once at import
+_DAILY_HTML_PRE = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Learning Digest - $date</title>
+    <style>
+"""
+)
+
+_DAILY_HTML_HEADER = Template(
+    """    </style>
 </head>
 <body>
     <div class="digest-header">
         <h1 class="digest-title">📚 Your Learning Digest</h1>
         <div class="digest-meta">
-            <span>📅 {date}</span>
-            <span class="quality-badge {_get_badge_class(quality_badge)}">
-                {quality_badge} Quality Score: {ragas_scores.get('average', 0.75):.2f}
+            <span>📅 $date</span>
+            <span class="quality-badge $badge_class">
+                $quality_badge Quality Score: $average
             </span>
             <div class="ragas-scores">
                 <div class="ragas-score">
                     <span class="ragas-label">Faithfulness</span>
-                    <span class="ragas-value">{ragas_scores.get('faithfulness', 0.75):.2f}</span>
+                    <span class="ragas-value">$faithfulness</span>
                 </div>
                 <div class="ragas-score">
                     <span class="ragas-label">Precision</span>
-                    <span class="ragas-value">{ragas_scores.get('context_precision', 0.75):.2f}</span>
+                    <span class="ragas-value">$context_precision</span>
                 </div>
                 <div class="ragas-score">
                     <span class="ragas-label">Recall</span>
-                    <span class="ragas-value">{ragas_scores.get('context_recall', 0.75):.2f}</span>
+                    <span class="ragas-value">$context_recall</span>
                 </div>
             </div>
         </div>
     </div>
 
     <div class="insights-container">
-        {insights_html}
-    </div>
-
-    <script>
-        // Expand/collapse functionality
-        document.querySelectorAll('.read-more').forEach(btn => {{
-            btn.addEventListener('click', (e) => {{
+        """
+)
+
+# Static page script (read-more toggles, feedback buttons). It has to stay
+# inline: the page is served as an MCP resource into a sandboxed iframe, so
+# there is no origin to load a separate script file from
+_DAILY_JS = """        // Expand/collapse functionality
+        document.querySelectorAll('.read-more').forEach(btn => {
+            btn.addEventListener('click', (e) => {
                 e.preventDefault();
                 const explanation = e.target.previousElementSibling;
                 explanation.classList.toggle('collapsed');
                 e.target.textContent = explanation.classList.contains('collapsed')
                     ? 'Read more →'
                     : '← Read less';
-            }});
-        }});
+            });
+        });
 
         // Feedback handling
-        document.querySelectorAll('.feedback-btn').forEach(btn => {{
-            btn.addEventListener('click', async (e) => {{
+        document.querySelectorAll('.feedback-btn').forEach(btn => {
+            btn.addEventListener('click', async (e) => {
                 const insightId = e.currentTarget.dataset.insightId;
                 const feedbackType = e.currentTarget.dataset.feedbackType;
 
                 // Send message to parent (Claude.ai via MCP)
-                if (window.parent && window.parent.postMessage) {{
-                    window.parent.postMessage({{
+                if (window.parent && window.parent.postMessage) {
+                    window.parent.postMessage({
                         type: 'mcp-tool-call',
                         tool: 'provide_feedback',
-                        params: {{
+                        params: {
                             insight_id: insightId,
                             feedback_type: feedbackType
-                        }}
-                    }}, '*');
-                }}
+                        }
+                    }, '*');
+                }
 
                 // Visual feedback
                 e.currentTarget.classList.add('active');
-                if (feedbackType.includes('not_') || feedbackType === 'incorrect') {{
+                if (feedbackType.includes('not_') || feedbackType === 'incorrect') {
                     e.currentTarget.classList.add('negative');
-                }}
+                }
 
                 const icon = feedbackType === 'helpful' ? '✓' : '✗';
                 e.currentTarget.textContent = icon + ' ' + e.currentTarget.textContent.replace('👍', '').replace('👎', '').trim();
 
                 // Disable other buttons in same group
                 const card = e.currentTarget.closest('.insight-card');
-                card.querySelectorAll('.feedback-btn').forEach(otherBtn => {{
-                    if (otherBtn !== e.currentTarget) {{
+                card.querySelectorAll('.feedback-btn').forEach(otherBtn => {
+                    if (otherBtn !== e.currentTarget) {
                         otherBtn.disabled = true;
                         otherBtn.style.opacity = '0.5';
-                    }}
-                }});
-            }});
-        }});
-
-        // Log render event
-        console.log('Daily digest rendered:', {{
-            date: '{date}',
-            insights: {len(insights)},
-            quality: '{quality_badge}'
-        }});
-    </script>
-</body>
-</html>"""
+                    }
+                });
+            });
+        });
 
-    return html
+"""
 
+# Closes the insights container and opens the script; built once at import
+_DAILY_FOOTER_PRE = "\n    </div>\n\n    <script>\n" + _DAILY_JS
 
-def _render_insights(insights: list) -> str:
-    """Render individual insight cards."""
-    if not insights:
-        return """
-        <div class="empty-state">
-            <div class="empty-state-icon">📭</div>
-            <div class="empty-state-title">No insights available</div>
-            <p>Try adding more content sources or adjusting your learning context.</p>
-        </div>
-        """
-
-    cards = []
-    for i, insight in enumerate(insights, 1):
-        # Extract fields with defaults
-        title = insight.get("title", "Untitled Insight")
-        relevance = insight.get("relevance_reason", "")
-        explanation = insight.get("explanation", "")
-        takeaway = insight.get("practical_takeaway", "")
-        source = insight.get("source", {})
-        metadata = insight.get("metadata", {})
-        insight_id = insight.get("id", f"insight_{i}")
+_DAILY_HTML_FOOTER = Template(
+    """        // Log render event
+        console.log('Daily digest rendered:', $render_info);
+    </script>
+</body>
+</html>"""
+)
 
-        # Truncate long explanations
-        should_collapse = len(explanation) > 500
-        collapsed_class = "collapsed" if should_collapse else ""
 
-        card = f"""
+# Per-insight card, filled with str.format_map by _iter_insight_cards
+_INSIGHT_CARD = """
         <div class="insight-card">
             <div class="insight-header">
-                <span class="insight-number">{i}</span>
-                <h2 class="insight-title">{_escape_html(title)}</h2>
+                <span class="insight-number">{number}</span>
+                <h2 class="insight-title">{title}</h2>
             </div>
 
-            {_render_relevance(relevance)}
+            {relevance}
 
             <div class="explanation {collapsed_class}">
-                {_format_text(explanation)}
+                {explanation}
             </div>
 
-            {f'<a href="#" class="read-more">Read more →</a>' if should_collapse else ''}
+            {read_more}
 
-            {_render_takeaway(takeaway)}
+            {takeaway}
 
-            {_render_source(source)}
+            {source}
 
             <div class="feedback-buttons">
                 <button class="feedback-btn" data-insight-id="{insight_id}" data-feedback-type="helpful">
@@ -534,9 +505,145 @@ def _render_insights(insights: list) -> str:
             </div>
         </div>
         """
-        cards.append(card)
 
-    return "\n".join(cards)
+_READ_MORE_LINK = '<a href="#" class="read-more">Read more →</a>'
+
+# Shown in place of the cards when a digest has no insights
+_EMPTY_STATE = """
+        <div class="empty-state">
+            <div class="empty-state-icon">📭</div>
+            <div class="empty-state-title">No insights available</div>
+            <p>Try adding more content sources or adjusting your learning context.</p>
+        </div>
+        """
+
+# Longest explanation formatted into a card; anything past this is cut with "…"
+MAX_RENDERED_EXPLANATION_CHARS = 10_000
+
+# Paragraph separator: a blank line plus any whitespace around it
+_PARAGRAPH_BREAK = re.compile(r"\s*\n\n\s*")
+
+# Quality badge -> CSS class; anything else renders as "warning"
+_BADGE_CLASSES = {"✨": "high", "✓": "good"}
+
+# Rendered pages kept for repeat fetches of an unchanged digest
+RENDER_CACHE_SIZE = 64
+
+_render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+
+def render_daily_digest_ui(digest: Dict[str, Any]) -> str:
+    """
+    Render daily digest as interactive HTML.
+
+    Args:
+        digest: Digest dictionary with insights and metadata
+
+    Returns:
+        HTML string for MCP UI resource
+    """
+    date = digest.get("date", datetime.now().date().isoformat())
+    cache_key = _render_cache.key(date, digest)
+    cached = _render_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Daily digest UI served from render cache")
+        return cached
+
+    logger.info("Rendering daily digest UI")
+    page = "".join(_iter_daily_digest_page(digest, date))
+    _render_cache.set(cache_key, page)
+    return page
+
+
+def iter_daily_digest_ui(digest: Dict[str, Any]) -> Iterator[str]:
+    """
+    Render daily digest as interactive HTML, one chunk at a time.
+
+    Yields the page head, stylesheet, header, each insight card and the
+    footer in order, so a caller writing to a stream never holds the whole
+    page. Joining the chunks gives exactly `render_daily_digest_ui(digest)`.
+
+    Args:
+        digest: Digest dictionary with insights and metadata
+
+    Yields:
+        Consecutive HTML fragments
+    """
+    yield from _iter_daily_digest_page(
+        digest, digest.get("date", datetime.now().date().isoformat())
+    )
+
+
+def _iter_daily_digest_page(digest: Dict[str, Any], date: str) -> Iterator[str]:
+    """Yield the page fragments for `digest`, dated `date`."""
+    insights = digest.get("insights", [])
+    quality_badge = digest.get("quality_badge", "✓")
+    ragas_scores = digest.get("ragas_scores", {})
+
+    yield _DAILY_HTML_PRE.substitute(date=date)
+    yield _DAILY_CSS
+    yield _DAILY_HTML_HEADER.substitute(
+        date=date,
+        badge_class=_get_badge_class(quality_badge),
+        quality_badge=quality_badge,
+        average=f"{ragas_scores.get('average', 0.75):.2f}",
+        faithfulness=f"{ragas_scores.get('faithfulness', 0.75):.2f}",
+        context_precision=f"{ragas_scores.get('context_precision', 0.75):.2f}",
+        context_recall=f"{ragas_scores.get('context_recall', 0.75):.2f}",
+    )
+    if insights:
+        yield from _iter_insight_cards(insights)
+    else:
+        yield _EMPTY_STATE
+    yield _DAILY_FOOTER_PRE
+    yield _DAILY_HTML_FOOTER.substitute(
+        render_info=_script_json(
+            {"date": date, "insights": len(insights), "quality": quality_badge}
+        )
+    )
+
+
+def _iter_insight_cards(insights: list) -> Iterator[str]:
+    """
+    Yield insight cards, newline-separated.
+
+    Args:
+        insights: Non-empty list of insight dicts
+
+    Yields:
+        Card HTML and the separators between cards
+    """
+    for i, insight in enumerate(insights, 1):
+        if i > 1:
+            yield "\n"
+
+        # Extract fields with defaults
+        title = insight.get("title", "Untitled Insight")
+        relevance = insight.get("relevance_reason", "")
+        explanation = insight.get("explanation", "")
+        takeaway = insight.get("practical_takeaway", "")
+        source = insight.get("source", {})
+        insight_id = insight.get("id", f"insight_{i}")
+
+        # Truncate long explanations
+        should_collapse = len(explanation) > 500
+        if len(explanation) > MAX_RENDERED_EXPLANATION_CHARS:
+            # Cap the text so one oversized insight can't blow up render cost
+            explanation = explanation[:MAX_RENDERED_EXPLANATION_CHARS] + "…"
+
+        yield _INSIGHT_CARD.format_map(
+            {
+                "number": i,
+                "title": _escape_html(title),
+                "relevance": _render_relevance(relevance) if relevance else "",
+                "collapsed_class": "collapsed" if should_collapse else "",
+                "explanation": _format_text(explanation) if explanation else "",
+                "read_more": _READ_MORE_LINK if should_collapse else "",
+                "takeaway": _render_takeaway(takeaway) if takeaway else "",
+                "source": _render_source(source) if source else "",
+                "insight_id": insight_id,
+            }
+        )
 
 
 def _render_relevance(relevance: str) -> str:
@@ -588,25 +695,19 @@ def _render_source(source: dict) -> str:
 
 def _get_badge_class(badge: str) -> str:
     """Get CSS class for quality badge."""
-    if badge == "✨":
-        return "high"
-    elif badge == "✓":
-        return "good"
-    else:
-        return "warning"
+    return _BADGE_CLASSES.get(badge, "warning")
 
 
 def _escape_html(text: str) -> str:
     """Escape HTML special characters."""
     if not text:
         return ""
-    return (
-        text.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&#x27;")
-    )
+    return html.escape(text)
+
+
+def _script_json(value: Any) -> str:
+    """Serialize a value as a JS literal that is safe inside a <script> block."""
+    return orjson.dumps(value, default=str).decode().replace("</", "<\\/")
 
 
 def _format_text(text: str) -> str:
@@ -614,17 +715,13 @@ def _format_text(text: str) -> str:
     if not text:
         return ""
 
-    # Split into paragraphs and wrap in <p> tags
-    paragraphs = text.split("\n\n")
-    formatted = []
-
-    for para in paragraphs:
-        para = para.strip()
-        if para:
-            # Escape HTML but preserve intentional formatting
-            para = _escape_html(para)
-            # Convert single newlines to <br>
-            para = para.replace("\n", "<br>")
-            formatted.append(f"<p>{para}</p>")
+    # Escape once up front; entities contain no whitespace, so paragraph
+    # splitting and stripping see the same boundaries as on the raw text
+    text = _escape_html(text.strip())
+    if not text:
+        return ""
 
-    return "\n".join(formatted)
+    # Blank-line-separated paragraphs in <p> tags, single newlines as <br>
+    return "\n".join(
+        ["<p>" + para.replace("\n", "<br>") + "</p>" for para in _PARAGRAPH_BREAK.split(text)]
+    )
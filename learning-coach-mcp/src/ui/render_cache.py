@@ -0,0 +1,69 @@
+"""
+Render Cache
+
+Small LRU of rendered HTML pages keyed by a hash of their inputs.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Rendered pages keyed by a SHA-256 of the data they were rendered from.
+
+    Renderers are pure functions of their input, so identical input (the same
+    digest fetched again by a client) can reuse the previous page verbatim.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize render cache.
+
+        Args:
+            maxsize: Maximum number of pages kept; the least recently used is evicted
+        """
+        self.maxsize = maxsize
+        self._pages: Dict[bytes, str] = {}
+
+    @staticmethod
+    def key(*parts: Any) -> Optional[bytes]:
+        """
+        Fingerprint render inputs.
+
+        Args:
+            parts: JSON-serializable values the page is rendered from
+
+        Returns:
+            Cache key, or None if the inputs can't be serialized (skip caching)
+        """
+        try:
+            return hashlib.sha256(
+                orjson.dumps(parts, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+            ).digest()
+        except TypeError as e:
+            logger.debug(f"Render inputs not cacheable: {e}")
+            return None
+
+    def get(self, key: Optional[bytes]) -> Optional[str]:
+        """Return the cached page for `key` and mark it recently used."""
+        if key is None:
+            return None
+        page = self._pages.pop(key, None)
+        if page is not None:
+            self._pages[key] = page
+        return page
+
+    def set(self, key: Optional[bytes], page: str) -> None:
+        """Store a rendered page, evicting the least recently used one if full."""
+        if key is None:
+            return
+        self._pages.pop(key, None)
+        if len(self._pages) >= self.maxsize:
+            del self._pages[next(iter(self._pages))]
+        self._pages[key] = page
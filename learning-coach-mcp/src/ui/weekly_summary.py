@@ -5,36 +5,15 @@ Renders weekly learning summary with analytics and progress tracking.
 """
 
 import logging
+from string import Template
 from typing import Dict, Any
 
-logger = logging.getLogger(__name__)
-
-
-def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
-    """
-    Render weekly summary as interactive HTML.
-
-    Args:
-        summary: Weekly summary data with insights and analytics
+from .render_cache import RenderCache
 
-    Returns:
-        HTML string for MCP UI resource
-    """
-    logger.info("Rendering weekly summary UI")
-
-    week_number = summary.get("week_number", 1)
-    insights = summary.get("insights", [])
-    learning_context = summary.get("learning_context", {})
-    analytics = summary.get("analytics", {})
+logger = logging.getLogger(__name__)
 
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Weekly Summary - Week {week_number}</title>
-    <style>
-        :root {{
+# Static stylesheet, emitted verbatim between the page head and body
+_WEEKLY_CSS = """        :root {
             --bg-primary: #0a0a0a;
             --bg-secondary: #1a1a1a;
             --bg-tertiary: #2a2a2a;
@@ -45,15 +24,15 @@ def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
             --success: #10b981;
             --warning: #f59e0b;
             --border: #333333;
-        }}
+        }
 
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             background: var(--bg-primary);
             color: var(--text-primary);
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
@@ -61,152 +40,167 @@ def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
             padding: 20px;
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
 
-        .header {{
+        .header {
             text-align: center;
             margin-bottom: 40px;
             padding-bottom: 20px;
             border-bottom: 1px solid var(--border);
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 32px;
             margin-bottom: 8px;
-        }}
+        }
 
-        .header .subtitle {{
+        .header .subtitle {
             color: var(--text-secondary);
             font-size: 16px;
-        }}
+        }
 
-        .progress-bar {{
+        .progress-bar {
             background: var(--bg-secondary);
             height: 8px;
             border-radius: 4px;
             overflow: hidden;
             margin-top: 16px;
-        }}
+        }
 
-        .progress-fill {{
+        .progress-fill {
             background: linear-gradient(90deg, var(--accent), var(--success));
             height: 100%;
             transition: width 0.3s ease;
-        }}
+        }
 
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 16px;
             margin-bottom: 40px;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: var(--bg-secondary);
             border: 1px solid var(--border);
             border-radius: 12px;
             padding: 20px;
             text-align: center;
-        }}
+        }
 
-        .stat-value {{
+        .stat-value {
             font-size: 36px;
             font-weight: 700;
             color: var(--accent);
             margin-bottom: 8px;
-        }}
+        }
 
-        .stat-label {{
+        .stat-label {
             color: var(--text-secondary);
             font-size: 14px;
-        }}
+        }
 
-        .section {{
+        .section {
             margin-bottom: 40px;
-        }}
+        }
 
-        .section-title {{
+        .section-title {
             font-size: 24px;
             font-weight: 600;
             margin-bottom: 20px;
             display: flex;
             align-items: center;
             gap: 10px;
-        }}
+        }
 
-        .insights-list {{
+        .insights-list {
             display: flex;
             flex-direction: column;
             gap: 16px;
-        }}
+        }
 
-        .insight-item {{
+        .insight-item {
             background: var(--bg-secondary);
             border: 1px solid var(--border);
             border-radius: 8px;
             padding: 16px;
-        }}
+        }
 
-        .insight-title {{
+        .insight-title {
             font-weight: 600;
             color: var(--accent);
             margin-bottom: 8px;
-        }}
+        }
 
-        .insight-preview {{
+        .insight-preview {
             color: var(--text-secondary);
             font-size: 14px;
-        }}
+        }
 
-        .topics-list {{
+        .topics-list {
             display: flex;
             flex-wrap: wrap;
             gap: 12px;
-        }}
+        }
 
-        .topic-tag {{
+        .topic-tag {
             background: var(--bg-tertiary);
             border: 1px solid var(--border);
             padding: 8px 16px;
             border-radius: 20px;
             font-size: 14px;
             color: var(--text-primary);
-        }}
+        }
 
-        @media (max-width: 768px) {{
-            .stats-grid {{
+        @media (max-width: 768px) {
+            .stats-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# Page skeleton around the stylesheet, parsed once at import
+_WEEKLY_HTML_PRE = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Weekly Summary - Week $week_number</title>
+    <style>
+"""
+)
+
+_WEEKLY_HTML_BODY = Template(
+    """    </style>
 </head>
 <body>
     <div class="header">
-        <h1>📊 Week {week_number} Summary</h1>
-        <p class="subtitle">{', '.join(learning_context.get('current_topics', []))}</p>
+        <h1>📊 Week $week_number Summary</h1>
+        <p class="subtitle">$topics_subtitle</p>
         <div class="progress-bar">
-            <div class="progress-fill" style="width: {(week_number / 24) * 100}%"></div>
+            <div class="progress-fill" style="width: $progress_width%"></div>
         </div>
         <p style="margin-top: 8px; color: var(--text-muted); font-size: 14px;">
-            Week {week_number} of 24 • {(week_number / 24) * 100:.1f}% Complete
+            Week $week_number of 24 • $progress_percent% Complete
         </p>
     </div>
 
     <div class="stats-grid">
         <div class="stat-card">
-            <div class="stat-value">{analytics.get('total_insights', 0)}</div>
+            <div class="stat-value">$total_insights</div>
             <div class="stat-label">Insights This Week</div>
         </div>
         <div class="stat-card">
-            <div class="stat-value">{analytics.get('helpful_rate', 85)}%</div>
+            <div class="stat-value">$helpful_rate%</div>
             <div class="stat-label">Helpful Rate</div>
         </div>
         <div class="stat-card">
-            <div class="stat-value">{analytics.get('sources_used', 5)}</div>
+            <div class="stat-value">$sources_used</div>
             <div class="stat-label">Sources</div>
         </div>
         <div class="stat-card">
-            <div class="stat-value">{analytics.get('topics_covered', 3)}</div>
+            <div class="stat-value">$topics_covered</div>
             <div class="stat-label">Topics Covered</div>
         </div>
     </div>
@@ -214,14 +208,14 @@ def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
     <div class="section">
         <h2 class="section-title">🎯 Topics Covered</h2>
         <div class="topics-list">
-            {_render_topics(learning_context.get('current_topics', []))}
+            $topics_html
         </div>
     </div>
 
     <div class="section">
         <h2 class="section-title">💡 Top Insights</h2>
         <div class="insights-list">
-            {_render_top_insights(insights[:10])}
+            $insights_html
         </div>
     </div>
 
@@ -240,8 +234,68 @@ def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
     </div>
 </body>
 </html>"""
+)
 
-    return html
+# One entry in the top-insights list
+_INSIGHT_ITEM = """
+        <div class="insight-item">
+            <div class="insight-title">{number}. {title}</div>
+            <div class="insight-preview">{preview}</div>
+        </div>
+        """
+
+# One topic tag, pre-bound to its format string
+_topic_tag = '<div class="topic-tag">{}</div>'.format
+
+
+# Rendered pages kept for repeat fetches of an unchanged summary
+RENDER_CACHE_SIZE = 16
+
+_render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+
+def render_weekly_summary_ui(summary: Dict[str, Any]) -> str:
+    """
+    Render weekly summary as interactive HTML.
+
+    Args:
+        summary: Weekly summary data with insights and analytics
+
+    Returns:
+        HTML string for MCP UI resource
+    """
+    cache_key = _render_cache.key(summary)
+    cached = _render_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Weekly summary UI served from render cache")
+        return cached
+
+    logger.info("Rendering weekly summary UI")
+
+    week_number = summary.get("week_number", 1)
+    insights = summary.get("insights", [])
+    learning_context = summary.get("learning_context", {})
+    analytics = summary.get("analytics", {})
+
+    current_topics = learning_context.get("current_topics", [])
+    progress = (week_number / 24) * 100
+
+    body = _WEEKLY_HTML_BODY.substitute(
+        week_number=week_number,
+        topics_subtitle=", ".join(current_topics),
+        progress_width=progress,
+        progress_percent=f"{progress:.1f}",
+        total_insights=analytics.get("total_insights", 0),
+        helpful_rate=analytics.get("helpful_rate", 85),
+        sources_used=analytics.get("sources_used", 5),
+        topics_covered=analytics.get("topics_covered", 3),
+        topics_html=_render_topics(current_topics),
+        insights_html=_render_top_insights(insights[:10]),
+    )
+
+    page = "".join([_WEEKLY_HTML_PRE.substitute(week_number=week_number), _WEEKLY_CSS, body])
+    _render_cache.set(cache_key, page)
+    return page
 
 
 def _render_topics(topics: list) -> str:
@@ -249,11 +303,7 @@ def _render_topics(topics: list) -> str:
     if not topics:
         return '<div class="topic-tag">No topics yet</div>'
 
-    tags = []
-    for topic in topics:
-        tags.append(f'<div class="topic-tag">{topic}</div>')
-
-    return "\n".join(tags)
+    return "\n".join(map(_topic_tag, topics))
 
 
 def _render_top_insights(insights: list) -> str:
@@ -261,17 +311,14 @@ def _render_top_insights(insights: list) -> str:
     if not insights:
         return '<div style="color: var(--text-muted); text-align: center; padding: 20px;">No insights this week</div>'
 
-    items = []
-    for i, insight in enumerate(insights, 1):
-        title = insight.get("title", "Untitled")
-        explanation = insight.get("explanation", "")
-        preview = explanation[:150] + "..." if len(explanation) > 150 else explanation
+    return "\n".join([_format_insight_item(i, insight) for i, insight in enumerate(insights, 1)])
 
-        items.append(f"""
-        <div class="insight-item">
-            <div class="insight-title">{i}. {title}</div>
-            <div class="insight-preview">{preview}</div>
-        </div>
-        """)
 
-    return "\n".join(items)
+def _format_insight_item(number: int, insight: Dict[str, Any]) -> str:
+    """Render one numbered top-insight entry with a 150-char preview."""
+    explanation = insight.get("explanation", "")
+    preview = explanation[:150] + "..." if len(explanation) > 150 else explanation
+
+    return _INSIGHT_ITEM.format_map(
+        {"number": number, "title": insight.get("title", "Untitled"), "preview": preview}
+    )
@@ -1,5 +1,17 @@
 """Utility functions for AI Learning Coach."""
 
-from .db import get_supabase_client
+from .db import clear_supabase_clients, create_pg_pool, get_supabase_client
+from .disk_cache import DiskCache
+from .embedding_cache import EmbeddingCache
+from .openai_client import get_openai_client
+from .vector_store import VectorStore
 
-__all__ = ["get_supabase_client"]
+__all__ = [
+    "get_supabase_client",
+    "clear_supabase_clients",
+    "create_pg_pool",
+    "get_openai_client",
+    "DiskCache",
+    "EmbeddingCache",
+    "VectorStore",
+]
@@ -1,16 +1,33 @@
 """Database utilities for Supabase."""
 
-from typing import Optional
+import asyncio
+import os
+from functools import lru_cache
+from typing import Any, Optional
 from supabase import create_client, Client
 import logging
 
+try:
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+except ImportError:  # optional: direct Postgres connection for bulk COPY writes
+    asyncpg = None
+    register_vector = None
+
 logger = logging.getLogger(__name__)
 
+# Connections held by the direct Postgres pool (ingestion writes sequentially)
+PG_POOL_MAX_SIZE = 4
+
 
+@lru_cache(maxsize=4)
 def get_supabase_client(url: str, key: str) -> Client:
     """
     Create and return a Supabase client.
 
+    Clients are cached per (url, key), so every component using the same
+    credentials shares one client and its pooled HTTP connections.
+
     Args:
         url: Supabase project URL
         key: Supabase API key
@@ -27,6 +44,45 @@ def get_supabase_client(url: str, key: str) -> Client:
         raise
 
 
+def clear_supabase_clients() -> None:
+    """Drop all cached Supabase clients (e.g. after rotating credentials)."""
+    get_supabase_client.cache_clear()
+
+
+async def create_pg_pool(dsn: Optional[str] = None) -> Optional[Any]:
+    """
+    Open a direct Postgres connection pool for bulk writes.
+
+    Bypasses PostgREST so bulk inserts can use binary COPY. Optional: needs the
+    `pg` extra and a connection string; callers fall back to the Supabase client
+    when this returns None.
+
+    Args:
+        dsn: Postgres connection string (default: $SUPABASE_DB_URL)
+
+    Returns:
+        asyncpg pool with pgvector types registered, or None if unavailable
+    """
+    dsn = dsn or os.getenv("SUPABASE_DB_URL")
+    if asyncpg is None or not dsn:
+        return None
+
+    try:
+        pool = await asyncpg.create_pool(
+            dsn,
+            min_size=1,
+            max_size=PG_POOL_MAX_SIZE,
+            init=register_vector,
+            # Supabase's transaction pooler can't keep prepared statements
+            statement_cache_size=0,
+        )
+        logger.debug("Postgres pool created successfully")
+        return pool
+    except Exception as e:
+        logger.warning(f"Failed to create Postgres pool, using PostgREST: {e}")
+        return None
+
+
 async def check_db_connection(client: Client) -> bool:
     """
     Check if database connection is working.
@@ -38,8 +94,14 @@ async def check_db_connection(client: Client) -> bool:
         True if connection successful, False otherwise
     """
     try:
-        # Try a simple query
-        result = client.table("users").select("id").limit(1).execute()
+        # HEAD on the query the check used to run: the key and table are
+        # validated (401/403/404 fail, as the query did) but no rows are sent
+        response = await asyncio.to_thread(
+            client.postgrest.session.head, "/users", params={"select": "id", "limit": "1"}
+        )
+        if response.status_code >= 400:
+            logger.error(f"Database connection check failed: HTTP {response.status_code}")
+            return False
         logger.debug("Database connection check successful")
         return True
     except Exception as e:
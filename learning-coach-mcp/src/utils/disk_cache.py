@@ -0,0 +1,115 @@
+"""SQLite-backed key/value cache shared across processes."""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def default_cache_path(filename: str) -> str:
+    """
+    Return a cache file path in the per-user cache directory.
+
+    Uses $XDG_CACHE_HOME/learning-coach (default ~/.cache/learning-coach),
+    created private (0700) so other local users can't plant cache entries.
+    If it can't be created, caches opened there disable themselves.
+
+    Args:
+        filename: Cache file name
+
+    Returns:
+        Absolute cache file path
+    """
+    cache_dir = os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "learning-coach",
+    )
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Cannot create cache directory {cache_dir}: {e}")
+    return os.path.join(cache_dir, filename)
+
+
+class DiskCache:
+    """
+    Byte-valued cache with per-entry TTL.
+
+    Uses SQLite in WAL mode so several worker processes can share one file.
+    All errors are logged and swallowed: the cache is best-effort.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize disk cache.
+
+        Args:
+            path: SQLite file path
+            ttl_seconds: Entry lifetime in seconds (default: 7 days)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        conn = None
+        try:
+            conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key BLOB PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            # Unwritable, locked or corrupt file: run without a cache
+            logger.warning(f"Cache unavailable, disabled ({path}): {e}")
+            if conn is not None:
+                conn.close()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Return the stored value, or None on miss/expiry."""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed ({self.path}): {e}")
+            return None
+
+        if not row or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: bytes, value: bytes) -> None:
+        """Store a value with the cache TTL."""
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl_seconds),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.path}): {e}")
+
+    def set_many(self, items: Iterable[Tuple[bytes, bytes]]) -> None:
+        """Store several (key, value) pairs in one transaction (a single commit)."""
+        if self._conn is None:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    ((key, value, expires_at) for key, value in items),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.path}): {e}")
@@ -0,0 +1,78 @@
+"""Persistent on-disk cache for OpenAI embeddings."""
+
+import hashlib
+import os
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .disk_cache import DEFAULT_TTL_SECONDS, DiskCache, default_cache_path
+
+
+class EmbeddingCache:
+    """Embedding cache keyed by sha256(model + text), stored as float32."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize embedding cache.
+
+        Args:
+            path: SQLite file path (default: $EMBEDDING_CACHE_PATH or the user cache dir)
+            ttl_seconds: Entry lifetime in seconds (default: 7 days)
+        """
+        self._store = DiskCache(
+            path
+            or os.getenv("EMBEDDING_CACHE_PATH")
+            or default_cache_path("learning_coach_embeddings.sqlite3"),
+            ttl_seconds=ttl_seconds,
+        )
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """Build the cache key for a model/text pair."""
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).digest()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model: Embedding model name
+            text: Embedded text
+
+        Returns:
+            float32 embedding vector (read-only), or None on miss/expiry
+        """
+        blob = self._store.get(self.make_key(model, text))
+        if blob is None:
+            return None
+
+        return np.frombuffer(blob, dtype=np.float32)
+
+    def set(self, model: str, text: str, embedding: Sequence[float]) -> None:
+        """
+        Store an embedding.
+
+        Args:
+            model: Embedding model name
+            text: Embedded text
+            embedding: Embedding vector
+        """
+        self._store.set(self.make_key(model, text), self._encode(embedding))
+
+    def set_many(self, model: str, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        """
+        Store several embeddings in one transaction.
+
+        Args:
+            model: Embedding model name
+            items: (text, embedding) pairs
+        """
+        self._store.set_many(
+            (self.make_key(model, text), self._encode(embedding)) for text, embedding in items
+        )
+
+    @staticmethod
+    def _encode(embedding: Sequence[float]) -> bytes:
+        """Serialize an embedding as raw float32 bytes."""
+        return np.asarray(embedding, dtype=np.float32).tobytes()
@@ -0,0 +1,26 @@
+"""Shared OpenAI client."""
+
+from functools import lru_cache
+from openai import AsyncOpenAI
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4)
+def get_openai_client(api_key: str) -> AsyncOpenAI:
+    """
+    Create and return an async OpenAI client.
+
+    Clients are cached per API key, like get_supabase_client, so the
+    retriever and insight search share one client and its connection pool.
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        AsyncOpenAI client instance
+    """
+    client = AsyncOpenAI(api_key=api_key)
+    logger.debug("OpenAI client created successfully")
+    return client
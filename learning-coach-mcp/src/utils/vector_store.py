@@ -0,0 +1,125 @@
+"""Append-only on-disk store of float32 vectors, read through np.memmap."""
+
+import logging
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .disk_cache import default_cache_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are unlocked
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore:
+    """
+    Vectors keyed by string ID, stored as an (N, D) float32 matrix file.
+
+    `<path>.f32` holds the raw rows and `<path>.ids` one "row<TAB>id" line per
+    vector. Both files are only ever appended to, so readers memory-map the
+    matrix and never parse anything but the ID index. All errors are logged and
+    swallowed: the store is best-effort, like DiskCache.
+    """
+
+    def __init__(self, path: Optional[str] = None, dimensions: int = 1536):
+        """
+        Initialize vector store.
+
+        Args:
+            path: File prefix (default: $INSIGHT_VECTOR_STORE_PATH or the user cache dir)
+            dimensions: Vector dimensions
+        """
+        self.path = (
+            path
+            or os.getenv("INSIGHT_VECTOR_STORE_PATH")
+            or default_cache_path("learning_coach_insight_vectors")
+        )
+        self.dimensions = dimensions
+        self._matrix_path = f"{self.path}.f32"
+        self._ids_path = f"{self.path}.ids"
+        self._rows: Dict[str, int] = {}
+        self._ids_size = 0
+        self._matrix: Optional[np.ndarray] = None
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up vectors by ID.
+
+        Args:
+            ids: IDs to look up
+
+        Returns:
+            Mapping of ID to read-only vector (missing IDs are omitted)
+        """
+        self._refresh()
+        if self._matrix is None:
+            return {}
+        return {id_: self._matrix[self._rows[id_]] for id_ in ids if id_ in self._rows}
+
+    def add(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """
+        Append vectors for IDs not already stored.
+
+        Args:
+            items: (id, vector) pairs
+        """
+        self._refresh()
+        new = {id_: vector for id_, vector in items if id_ not in self._rows}
+        if not new:
+            return
+
+        rows = np.asarray(list(new.values()), dtype=np.float32).reshape(-1, self.dimensions)
+        try:
+            with open(self._ids_path, "a", encoding="utf-8") as ids_file:
+                if fcntl is not None:
+                    fcntl.flock(ids_file, fcntl.LOCK_EX)
+                # Rows first, then the index lines pointing at them: a crash in
+                # between leaves unreferenced bytes rather than IDs without rows
+                with open(self._matrix_path, "ab") as matrix_file:
+                    row_bytes = 4 * self.dimensions
+                    # Pad past any torn row so new rows stay aligned
+                    matrix_file.write(b"\0" * (-matrix_file.tell() % row_bytes))
+                    start = matrix_file.tell() // row_bytes
+                    matrix_file.write(rows.tobytes())
+                ids_file.write(
+                    "".join(f"{start + offset}\t{id_}\n" for offset, id_ in enumerate(new))
+                )
+        except OSError as e:
+            logger.warning(f"Vector store write failed ({self.path}): {e}")
+
+    def _refresh(self) -> None:
+        """Re-map the files if another writer has appended since the last read."""
+        try:
+            ids_size = os.path.getsize(self._ids_path)
+        except OSError:
+            return
+        if ids_size == self._ids_size:
+            return
+
+        try:
+            with open(self._ids_path, encoding="utf-8") as ids_file:
+                lines = ids_file.read().splitlines()
+            count = os.path.getsize(self._matrix_path) // (4 * self.dimensions)
+            self._matrix = (
+                np.memmap(
+                    self._matrix_path, dtype=np.float32, mode="r", shape=(count, self.dimensions)
+                )
+                if count
+                else None
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Vector store read failed ({self.path}): {e}")
+            return
+
+        self._rows = {}
+        for line in lines:
+            row, _, id_ = line.partition("\t")
+            # Skip torn lines; first occurrence wins if two writers raced
+            if id_ and row.isdigit() and int(row) < count:
+                self._rows.setdefault(id_, int(row))
+        self._ids_size = ids_size
@@ -15,6 +15,7 @@ Usage:
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -102,6 +103,12 @@ def check_environment():
     print("\n✅ All required environment variables are set!")
     return True
 
+@lru_cache(maxsize=1)
+def _supabase():
+    """Supabase client shared by every setup step."""
+    from supabase import create_client
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
 def test_database_connection():
     """Test connection to Supabase."""
     print("\n" + "="*70)
@@ -109,12 +116,7 @@ def test_database_connection():
     print("="*70)
 
     try:
-        from supabase import create_client
-
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
-
-        client = create_client(supabase_url, supabase_key)
+        client = _supabase()
 
         # Try to query users table
         result = client.table('users').select('*').limit(1).execute()
@@ -152,8 +154,7 @@ def init_database():
 
     # Verify test data exists
     try:
-        from supabase import create_client
-        client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        client = _supabase()
 
         test_user_id = '00000000-0000-0000-0000-000000000001'
 
@@ -189,15 +190,12 @@ def test_openai_connection():
         from openai import OpenAI
         client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-        # Test with a simple embedding
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input="test",
-            dimensions=1536
-        )
+        # Model lookup is a metadata GET: verifies the key and model access
+        # without spending tokens on a throwaway embedding
+        model = client.models.retrieve("text-embedding-3-small")
 
         print("✓ OpenAI API connection successful")
-        print(f"✓ Embedding dimension: {len(response.data[0].embedding)}")
+        print(f"✓ Model available: {model.id}")
         return True
 
     except Exception as e:
@@ -214,15 +212,11 @@ def test_anthropic_connection():
         from anthropic import Anthropic
         client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
-        # Test with a simple message
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=100,
-            messages=[{"role": "user", "content": "Say hello"}]
-        )
+        # Model lookup instead of a billed "hello" completion
+        model = client.models.retrieve("claude-sonnet-4-20250514")
 
         print("✓ Anthropic API connection successful")
-        print(f"✓ Response: {message.content[0].text[:50]}...")
+        print(f"✓ Model available: {model.display_name}")
         return True
 
     except Exception as e: